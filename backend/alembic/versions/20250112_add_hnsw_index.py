@@ -0,0 +1,41 @@
+"""add tuned HNSW index on wardrobe.vector_embedding
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-01-12
+
+pgvectorはデータ投入後のインデックス作成を推奨しているため、
+初期マイグレーションとは別リビジョンでHNSWインデックスを作成する。
+クエリセッション側では `SET hnsw.ef_search = 100` を設定すること
+（recall/速度のバランス調整用）。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # HNSWグラフ構築をメモリ内で完結させ、並列ビルドを有効化
+    # (並列HNSWビルドにはpgvector >= 0.6.0が必要。
+    #  デフォルトの64MBでは10万行規模でディスクにあふれる)
+    op.execute("SET maintenance_work_mem = '4GB'")
+    op.execute("SET max_parallel_maintenance_workers = 7")
+    op.execute("SET max_parallel_workers_per_gather = 7")
+
+    # デフォルトパラメータ(m=16, ef_construction=64)より高recall寄りの設定。
+    # HNSWのグラフ探索によりO(N)の全件距離計算がO(log N)になる。
+    op.execute(
+        'CREATE INDEX idx_wardrobe_embedding_hnsw ON wardrobe '
+        'USING hnsw (vector_embedding halfvec_cosine_ops) '
+        'WITH (m = 24, ef_construction = 128)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS idx_wardrobe_embedding_hnsw')
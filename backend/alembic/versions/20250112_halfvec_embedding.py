@@ -0,0 +1,34 @@
+"""convert wardrobe.vector_embedding to halfvec
+
+Revision ID: 001a
+Revises: 001
+Create Date: 2025-01-12
+
+適用済みの001は書き換えず、vector(768)→halfvec(768)の型変更を
+独立リビジョンとして発行する。halfvec(FP16)でストレージとメモリ帯域を
+FP32比で半減する（recall低下はごく僅か）。002のHNSWインデックス
+（halfvec_cosine_ops）はこのリビジョンの適用が前提。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '001a'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        'ALTER TABLE wardrobe ALTER COLUMN vector_embedding '
+        'TYPE halfvec(768) USING vector_embedding::halfvec(768)'
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        'ALTER TABLE wardrobe ALTER COLUMN vector_embedding '
+        'TYPE vector(768) USING vector_embedding::vector(768)'
+    )
@@ -0,0 +1,40 @@
+"""add filter indexes for list_wardrobe_items predicates
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-01-13
+
+list_wardrobe_items のフィルタ（category, season_tags @> ARRAY[...]）と
+ページネーションに合わせたインデックスを追加する。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 配列の包含演算子 (@> / &&) にはGINが適切
+    op.execute(
+        'CREATE INDEX idx_wardrobe_season_tags_gin ON wardrobe '
+        'USING gin (season_tags)'
+    )
+
+    # category絞り込み + keysetページネーション用の複合インデックス
+    # （index-only scanでページングできる）
+    op.create_index('idx_wardrobe_category_id', 'wardrobe', ['category', 'id'])
+
+    # color_primary単独フィルタは現状どのクエリも使わないため削除
+    # （インデックスは書き込みコストになる）
+    op.drop_index('idx_wardrobe_color_primary')
+
+
+def downgrade() -> None:
+    op.create_index('idx_wardrobe_color_primary', 'wardrobe', ['color_primary'])
+    op.drop_index('idx_wardrobe_category_id')
+    op.execute('DROP INDEX IF EXISTS idx_wardrobe_season_tags_gin')
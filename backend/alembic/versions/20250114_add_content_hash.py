@@ -0,0 +1,27 @@
+"""add content_hash to wardrobe for image dedupe
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-01-14
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('wardrobe', sa.Column('content_hash', sa.String(64)))
+    op.create_index('idx_wardrobe_content_hash', 'wardrobe', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_wardrobe_content_hash')
+    op.drop_column('wardrobe', 'content_hash')
@@ -0,0 +1,67 @@
+"""normalize outfits.item_ids into outfit_items join table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-01-15
+
+ARRAY(UUID)はFK整合性が効かず（アイテム削除でダングリングIDが残る）、
+参照もアプリ側の手動IN句になる。複合PKの中間テーブルに正規化して
+JOIN/逆引きをインデックススキャンにする。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outfit_items',
+        sa.Column(
+            'outfit_id',
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('outfits.id', ondelete='CASCADE'),
+            primary_key=True,
+        ),
+        sa.Column(
+            'item_id',
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('wardrobe.id', ondelete='CASCADE'),
+            primary_key=True,
+        ),
+        sa.Column('position', sa.SmallInteger()),
+    )
+    # 「このアイテムを使っているコーデは？」の逆引き用
+    op.create_index('idx_outfit_items_item_id', 'outfit_items', ['item_id'])
+
+    # 既存の配列データを移行（配列順をpositionとして保持）
+    op.execute(
+        'INSERT INTO outfit_items (outfit_id, item_id, position) '
+        'SELECT o.id, u.item_id, (u.ord - 1)::smallint '
+        'FROM outfits o '
+        'CROSS JOIN LATERAL unnest(o.item_ids) WITH ORDINALITY AS u(item_id, ord)'
+    )
+
+    op.drop_column('outfits', 'item_ids')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'outfits',
+        sa.Column('item_ids', postgresql.ARRAY(postgresql.UUID(as_uuid=True))),
+    )
+    op.execute(
+        'UPDATE outfits o SET item_ids = sub.ids FROM ('
+        'SELECT outfit_id, array_agg(item_id ORDER BY position) AS ids '
+        'FROM outfit_items GROUP BY outfit_id) sub '
+        'WHERE o.id = sub.outfit_id'
+    )
+    op.drop_index('idx_outfit_items_item_id')
+    op.drop_table('outfit_items')
@@ -0,0 +1,51 @@
+"""add partial HNSW indexes per clothing category
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-01-16
+
+コーディネート系の類似検索はほぼ必ずcategoryで絞ってからANN検索する。
+単一HNSWへのポストフィルタはef_searchを膨らませないとk件に届かず、
+最悪kNNシーケンシャルスキャンに落ちるため、カテゴリ毎の部分HNSW
+インデックスを張る（グラフサイズが1/カテゴリ数になり探索も速い）。
+
+アプリ側は `WHERE category = :c ORDER BY vector_embedding <=> :q LIMIT k`
+の形でクエリすれば、プランナが該当の部分インデックスを選択する。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# インデックス名サフィックス → categoryカラム値
+CATEGORIES = {
+    'tops': 'トップス',
+    'bottoms': 'ボトムス',
+    'outer': 'アウター',
+    'onepiece': 'ワンピース',
+    'shoes': 'シューズ',
+    'accessory': 'アクセサリー',
+}
+
+
+def upgrade() -> None:
+    op.execute("SET maintenance_work_mem = '4GB'")
+    op.execute("SET max_parallel_maintenance_workers = 7")
+    op.execute("SET max_parallel_workers_per_gather = 7")
+    for suffix, category in CATEGORIES.items():
+        op.execute(
+            f'CREATE INDEX idx_wardrobe_emb_{suffix} ON wardrobe '
+            f'USING hnsw (vector_embedding halfvec_cosine_ops) '
+            f"WITH (m = 16, ef_construction = 64) "
+            f"WHERE category = '{category}'"
+        )
+
+
+def downgrade() -> None:
+    for suffix in CATEGORIES:
+        op.execute(f'DROP INDEX IF EXISTS idx_wardrobe_emb_{suffix}')
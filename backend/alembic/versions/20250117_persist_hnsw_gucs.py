@@ -0,0 +1,42 @@
+"""persist HNSW tuning GUCs at database/role level
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-01-17
+
+hnsw.ef_search等をセッション毎にSETするのではなく、DB/ロール単位で
+永続化してプールされた全コネクションに引き継がせる。
+高recallが必要なエンドポイントだけトランザクション内で
+`SET LOCAL hnsw.ef_search = 200` のように上書きすればよい。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    database = bind.engine.url.database
+    role = bind.engine.url.username
+
+    # 全セッションのデフォルト探索深度（recall/速度バランス）
+    op.execute(f'ALTER DATABASE "{database}" SET hnsw.ef_search = 100')
+    # インデックス再構築をこのロールで実行する際のビルド設定
+    op.execute(f'ALTER ROLE "{role}" SET maintenance_work_mem = \'2GB\'')
+    op.execute(f'ALTER ROLE "{role}" SET max_parallel_maintenance_workers = 7')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    database = bind.engine.url.database
+    role = bind.engine.url.username
+
+    op.execute(f'ALTER DATABASE "{database}" RESET hnsw.ef_search')
+    op.execute(f'ALTER ROLE "{role}" RESET maintenance_work_mem')
+    op.execute(f'ALTER ROLE "{role}" RESET max_parallel_maintenance_workers')
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 import redis
@@ -6,6 +7,18 @@ from app.core.config import settings
 
 router = APIRouter()
 
+# 接続プールはモジュールロード時に1度だけ構築し、リクエスト毎の
+# TCP+認証ハンドシェイクを避ける
+_redis_pool = redis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=16,
+    socket_timeout=2,
+)
+
+# SQLAlchemy 2.xは生文字列SQLを受け付けないためtext()でラップ。
+# TextClauseを使い回してプローブ毎の再パースも省く
+_DB_PING = text("SELECT 1")
+
 
 @router.get("")
 async def health_check(db: Session = Depends(get_db)):
@@ -21,16 +34,17 @@ async def health_check(db: Session = Depends(get_db)):
 
     # Check database connection
     try:
-        db.execute("SELECT 1")
+        db.execute(_DB_PING)
         health_status["database"] = "connected"
     except Exception as e:
         health_status["status"] = "unhealthy"
         health_status["database_error"] = str(e)
 
     # Check Redis connection
+    # PINGは毎回発行する。結果をキャッシュするとRedis停止後も
+    # しばらく"connected"を返し、オーケストレータの判断を誤らせる
     try:
-        r = redis.from_url(settings.REDIS_URL)
-        r.ping()
+        redis.Redis(connection_pool=_redis_pool).ping()
         health_status["redis"] = "connected"
     except Exception as e:
         health_status["status"] = "unhealthy"
@@ -0,0 +1,230 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import tuple_, update, insert, select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from uuid import UUID, uuid4
+from datetime import date
+from app.core.database import get_db
+from app.models.wardrobe import Outfit, WardrobeItem, outfit_items
+from app.schemas.wardrobe import (
+    OutfitCreate,
+    OutfitResponse,
+    OutfitDetail,
+    OutfitPage,
+)
+
+router = APIRouter()
+
+# jsonable_encoderを迂回する一覧レスポンス用シリアライザ
+_PAGE_ADAPTER = TypeAdapter(OutfitPage)
+
+
+def _item_ids_for(db: Session, outfit_id: UUID) -> List[UUID]:
+    """中間テーブルから構成アイテムIDをposition順に取得する"""
+    return list(
+        db.execute(
+            select(outfit_items.c.item_id)
+            .where(outfit_items.c.outfit_id == outfit_id)
+            .order_by(outfit_items.c.position)
+        ).scalars()
+    )
+
+
+def _to_response(outfit: Outfit, item_ids: List[UUID]) -> OutfitResponse:
+    """itemsリレーションをロードせずにレスポンスを組み立てる"""
+    return OutfitResponse(
+        id=outfit.id,
+        created_at=outfit.created_at,
+        worn_date=outfit.worn_date,
+        item_ids=item_ids,
+        weather_temp=outfit.weather_temp,
+        weather_condition=outfit.weather_condition,
+        occasion=outfit.occasion,
+        user_rating=outfit.user_rating,
+        notes=outfit.notes,
+    )
+
+
+@router.get("", response_model=OutfitPage)
+async def list_outfits(
+    cursor: Optional[UUID] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    コーディネート履歴一覧取得（keysetページネーション）
+
+    OFFSETはページが深くなるほどスキャン済み行の読み捨てが増えるため、
+    (created_at, id) のkeysetでページングする。cursorには前ページ
+    最終要素のidを渡す。
+    """
+    # itemsはselectinloadで一括ロード（lazy='raise_on_sql'のため明示必須）
+    query = (
+        db.query(Outfit)
+        .options(selectinload(Outfit.items))
+        .order_by(Outfit.created_at.desc(), Outfit.id.desc())
+    )
+    if cursor is not None:
+        cur = (
+            db.query(Outfit.created_at, Outfit.id)
+            .filter(Outfit.id == cursor)
+            .first()
+        )
+        if cur is None:
+            raise HTTPException(status_code=404, detail="Cursor outfit not found")
+        query = query.filter(tuple_(Outfit.created_at, Outfit.id) < cur)
+
+    outfits = query.limit(limit).all()
+    next_cursor = outfits[-1].id if len(outfits) == limit else None
+    page = OutfitPage(items=outfits, next_cursor=next_cursor)
+    return Response(
+        content=_PAGE_ADAPTER.dump_json(page),
+        media_type="application/json",
+    )
+
+
+@router.get("/{outfit_id}", response_model=OutfitDetail)
+async def get_outfit(
+    outfit_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """
+    コーディネート詳細取得（構成アイテム込み）
+    """
+    outfit = (
+        db.query(Outfit)
+        .options(selectinload(Outfit.items))
+        .filter(Outfit.id == outfit_id)
+        .first()
+    )
+    if not outfit:
+        raise HTTPException(status_code=404, detail="Outfit not found")
+    return OutfitDetail.model_validate(outfit)
+
+
+@router.post("", response_model=OutfitResponse, status_code=201)
+async def create_outfit(
+    outfit: OutfitCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    コーディネート登録
+    """
+    # アイテム存在チェックは1回のIN句クエリにまとめる
+    # （ループでのSELECT per itemはN+1になるため避ける）
+    found = {
+        row[0]
+        for row in db.query(WardrobeItem.id)
+        .filter(WardrobeItem.id.in_(outfit.item_ids))
+        .all()
+    }
+    missing = set(outfit.item_ids) - found
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Wardrobe items not found: {sorted(str(i) for i in missing)}"
+        )
+
+    # add→flush→(refresh)ではなくINSERT ... RETURNINGの1往復で
+    # 生成行（id/created_at含む）を受け取る
+    db_outfit = db.execute(
+        insert(Outfit)
+        .values(
+            id=uuid4(),
+            created_at=date.today(),
+            **outfit.model_dump(exclude={"item_ids"}),
+        )
+        .returning(Outfit)
+    ).scalar_one()
+    if outfit.item_ids:
+        # 中間テーブルへは1回のexecutemanyでまとめて挿入
+        db.execute(
+            insert(outfit_items),
+            [
+                {"outfit_id": db_outfit.id, "item_id": item_id, "position": pos}
+                for pos, item_id in enumerate(outfit.item_ids)
+            ],
+        )
+    db.commit()
+    return _to_response(db_outfit, outfit.item_ids)
+
+
+@router.delete("/{outfit_id}", status_code=204)
+async def delete_outfit(
+    outfit_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """
+    コーディネート削除
+    """
+    deleted = (
+        db.query(Outfit)
+        .filter(Outfit.id == outfit_id)
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Outfit not found")
+    db.commit()
+
+
+@router.post("/{outfit_id}/rate", response_model=OutfitResponse)
+async def rate_outfit(
+    outfit_id: UUID,
+    rating: int = Query(..., ge=1, le=5),
+    db: Session = Depends(get_db)
+):
+    """
+    コーディネート評価 (1-5)
+
+    範囲チェックはQuery(ge/le)の宣言的バリデーションに任せ
+    （範囲外はDBに触れず422）、事前SELECTによる存在チェックはせず
+    UPDATE ... RETURNING の1往復で更新と404判定を兼ねる。
+    """
+    outfit = db.execute(
+        update(Outfit)
+        .where(Outfit.id == outfit_id)
+        .values(user_rating=rating)
+        .returning(Outfit)
+    ).scalar_one_or_none()
+    if outfit is None:
+        raise HTTPException(status_code=404, detail="Outfit not found")
+    db.commit()
+    return _to_response(outfit, _item_ids_for(db, outfit_id))
+
+
+@router.post("/{outfit_id}/wear", response_model=OutfitResponse)
+async def record_wear(
+    outfit_id: UUID,
+    worn_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    着用記録
+
+    outfit更新と構成アイテムのwear_count/last_worn更新を
+    それぞれ1クエリ（計2往復）で行う。
+    """
+    worn = worn_date or date.today()
+
+    outfit = db.execute(
+        update(Outfit)
+        .where(Outfit.id == outfit_id)
+        .values(worn_date=worn)
+        .returning(Outfit)
+    ).scalar_one_or_none()
+    if outfit is None:
+        raise HTTPException(status_code=404, detail="Outfit not found")
+
+    item_ids = _item_ids_for(db, outfit_id)
+    if item_ids:
+        db.execute(
+            update(WardrobeItem)
+            .where(WardrobeItem.id.in_(item_ids))
+            .values(
+                last_worn=worn,
+                wear_count=WardrobeItem.wear_count + 1,
+            )
+        )
+    db.commit()
+    return _to_response(outfit, item_ids)
@@ -1,51 +1,256 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response
+from pydantic import TypeAdapter
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session, load_only
+from typing import Optional
+from uuid import UUID, uuid4
+from pathlib import Path
+import aiofiles
+import hashlib
+import os
+from app.core.config import settings
 from app.core.database import get_db
+from app.models.wardrobe import WardrobeItem
+from app.schemas.wardrobe import (
+    WardrobeItemCreate,
+    WardrobeItemUpdate,
+    WardrobeItemResponse,
+    WardrobeItemPage,
+)
+from app.services.tasks import process_image_task
 
 router = APIRouter()
 
+# ストリーミング書き込みのチャンクサイズ (64KB)
+_UPLOAD_CHUNK_SIZE = 1 << 16
 
-@router.get("")
+# 許可する画像拡張子（ドットなし小文字）。リクエスト毎にsetを
+# 作り直さないようモジュールスコープのfrozensetにしておく
+_ALLOWED_EXTS = frozenset({"jpg", "jpeg", "png", "webp"})
+
+# 一覧レスポンスに必要なカラムのみ。768次元のvector_embeddingを
+# 毎回転送しないようload_onlyで絞る
+_LIST_COLUMNS = (
+    WardrobeItem.id,
+    WardrobeItem.image_path,
+    WardrobeItem.category,
+    WardrobeItem.color_primary,
+    WardrobeItem.color_secondary,
+    WardrobeItem.pattern,
+    WardrobeItem.material,
+    WardrobeItem.brand,
+    WardrobeItem.purchase_date,
+    WardrobeItem.last_worn,
+    WardrobeItem.wear_count,
+    WardrobeItem.season_tags,
+    WardrobeItem.style_tags,
+    WardrobeItem.care_instructions,
+)
+
+# モジュール定数のTypeAdapterで一覧レスポンスを直接bytesへ
+# シリアライズし、FastAPIのjsonable_encoder経由を迂回する
+_PAGE_ADAPTER = TypeAdapter(WardrobeItemPage)
+
+
+@router.get("", response_model=WardrobeItemPage)
 async def list_wardrobe_items(
-    skip: int = 0,
+    category: Optional[str] = None,
+    season: Optional[str] = None,
+    cursor: Optional[UUID] = None,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
     """
-    ワードローブアイテム一覧取得
-    (Phase 2で実装予定)
+    ワードローブアイテム一覧取得（keysetページネーション）
+
+    id昇順のkeysetでページングする。(category, id) 複合インデックスで
+    category絞り込みとの組み合わせもindex scanになる。
     """
-    return {
-        "message": "Wardrobe list endpoint - to be implemented in Phase 2",
-        "skip": skip,
-        "limit": limit
-    }
+    query = (
+        db.query(WardrobeItem)
+        .options(load_only(*_LIST_COLUMNS))
+        .order_by(WardrobeItem.id)
+        # 全行をバッファせずサーバサイドカーソルで50行ずつ取得
+        .yield_per(50)
+    )
+    if category:
+        query = query.filter(WardrobeItem.category == category)
+    if season:
+        query = query.filter(WardrobeItem.season_tags.contains([season]))
+    if cursor is not None:
+        query = query.filter(WardrobeItem.id > cursor)
+
+    items = query.limit(limit).all()
+    next_cursor = items[-1].id if len(items) == limit else None
+    page = WardrobeItemPage(items=items, next_cursor=next_cursor)
+    return Response(
+        content=_PAGE_ADAPTER.dump_json(page),
+        media_type="application/json",
+    )
 
 
-@router.post("")
+@router.post("", response_model=WardrobeItemResponse, status_code=201)
 async def create_wardrobe_item(
+    item: WardrobeItemCreate,
     db: Session = Depends(get_db)
 ):
     """
     ワードローブアイテム登録
-    (Phase 2で実装予定)
+
+    add→commit→refresh（refreshは全カラム再SELECT）ではなく
+    INSERT ... RETURNING の1往復で登録とレスポンス取得を済ませる。
     """
+    row = db.execute(
+        insert(WardrobeItem)
+        .values(**item.model_dump())
+        .returning(*_LIST_COLUMNS)
+    ).first()
+    db.commit()
+    return row
+
+
+@router.post("/upload", status_code=202)
+async def upload_clothing_image(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    衣類画像アップロード
+
+    ファイル全体をメモリに読み込まず64KBチャンクでディスクに
+    ストリーミング書き込みし、サイズ超過は書き込み中に検出して中断する。
+    書き込みと同じパスでSHA-256を計算し（Python 3.11+はOpenSSLの
+    SHA-NI実装で~2GB/s、ディスクI/O比で実質タダ）、ダイジェストを
+    保存ファイル名に使うことで同一画像の重複保存を防ぐ。
+    保存後はCeleryの画像処理タスクに引き渡す。
+    """
+    # UploadFile.filenameはOptional。filenameなしのmultipartパートで
+    # AttributeError（500）にしない
+    if not file.filename:
+        raise HTTPException(status_code=422, detail="Missing filename")
+    # Path()の生成コストを払わず文字列操作だけで拡張子を取り出す
+    ext = file.filename.rpartition(".")[2].lower()
+    if ext not in _ALLOWED_EXTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unsupported file type: .{ext}"
+        )
+    file_ext = f".{ext}"
+
+    upload_dir = Path(settings.UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = upload_dir / f"{uuid4()}.part"
+
+    total = 0
+    hasher = hashlib.sha256()
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail="File too large"
+                    )
+                hasher.update(chunk)
+                await f.write(chunk)
+
+        digest = hasher.hexdigest()
+        filepath = upload_dir / f"{digest}{file_ext}"
+        duplicate = filepath.exists()
+        if not duplicate:
+            os.replace(tmp_path, filepath)
+    finally:
+        # HTTPExceptionに限らず（クライアント切断・ディスクフル等でも）
+        # 書きかけの.partファイルを残さない。os.replace済みなら存在しない
+        if tmp_path.exists():
+            os.unlink(tmp_path)
+
+    if duplicate:
+        # 同一内容が登録済み：再処理は起動しない（起動すると同じ画像の
+        # ワードローブ行が二重に増える）。既存行はcontent_hash
+        # インデックスで引いて返す
+        existing_id = (
+            db.query(WardrobeItem.id)
+            .filter(WardrobeItem.content_hash == digest)
+            .scalar()
+        )
+        return {
+            "image_path": str(filepath),
+            "content_hash": digest,
+            "size": total,
+            "duplicate": True,
+            "item_id": str(existing_id) if existing_id else None,
+            "task_id": None,
+        }
+
+    # ハッシュをタスクへ引き渡し、WardrobeItem.content_hashに永続化する
+    task = process_image_task.delay(str(filepath), digest)
     return {
-        "message": "Wardrobe item creation - to be implemented in Phase 2"
+        "image_path": str(filepath),
+        "content_hash": digest,
+        "size": total,
+        "duplicate": False,
+        "item_id": None,
+        "task_id": task.id,
     }
 
 
-@router.get("/{item_id}")
+@router.get("/{item_id}", response_model=WardrobeItemResponse)
 async def get_wardrobe_item(
-    item_id: str,
+    item_id: UUID,
     db: Session = Depends(get_db)
 ):
     """
     ワードローブアイテム詳細取得
-    (Phase 2で実装予定)
     """
-    return {
-        "message": "Wardrobe item detail - to be implemented in Phase 2",
-        "item_id": item_id
-    }
+    item = db.query(WardrobeItem).filter(WardrobeItem.id == item_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Wardrobe item not found")
+    return item
+
+
+@router.put("/{item_id}", response_model=WardrobeItemResponse)
+async def update_wardrobe_item(
+    item_id: UUID,
+    item: WardrobeItemUpdate,
+    db: Session = Depends(get_db)
+):
+    """
+    ワードローブアイテム更新
+
+    存在チェックのための事前SELECT（vector_embedding込みの全カラム
+    フェッチ）はせず、UPDATE ... RETURNING の1往復で更新と404判定を行う。
+    """
+    values = item.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=422, detail="No fields to update")
+
+    row = db.execute(
+        update(WardrobeItem)
+        .where(WardrobeItem.id == item_id)
+        .values(**values)
+        .returning(*_LIST_COLUMNS)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Wardrobe item not found")
+    db.commit()
+    return row
+
+
+@router.delete("/{item_id}", status_code=204)
+async def delete_wardrobe_item(
+    item_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """
+    ワードローブアイテム削除（行ロードなしの1往復）
+    """
+    deleted = (
+        db.query(WardrobeItem)
+        .filter(WardrobeItem.id == item_id)
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Wardrobe item not found")
+    db.commit()
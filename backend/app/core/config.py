@@ -1,8 +1,19 @@
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 
 class Settings(BaseSettings):
+    # v2のSettingsConfigDictは.envのパース結果を_settings_build_values
+    # 内でキャッシュする（旧class Configは毎回再パース）
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        # 環境変数名は大文字小文字を区別しない（database_url等も受ける）
+        case_sensitive=False,
+        extra="ignore",
+    )
+
     # Application
     PROJECT_NAME: str = "Wardrobe Auto"
     VERSION: str = "0.1.0"
@@ -31,9 +42,17 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settingsを1度だけ構築して使い回す。
+
+    .envのパースとPydanticのバリデーションはプロセスにつき1回で済み、
+    テストでは get_settings.cache_clear() + 依存オーバーライドで
+    差し替えられる。
+    """
+    return Settings()
 
 
-settings = Settings()
+# 既存の `from app.core.config import settings` 互換エイリアス
+settings = get_settings()
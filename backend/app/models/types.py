@@ -0,0 +1,48 @@
+"""
+SQLite実行時（テスト）向けの互換カラム型
+
+本番PostgreSQLではARRAY/halfvecをネイティブに使い、SQLiteでは
+JSON文字列として格納する。with_variantでカラム定義に割り当てることで、
+変換はSQLAlchemyがカラム毎に1度コンパイルするバインドプロセッサが担い、
+ステートメント毎のPythonフックは不要になる。
+"""
+import json
+
+import numpy as np
+from sqlalchemy import Text, TypeDecorator
+
+
+class JSONEncodedList(TypeDecorator):
+    """list <-> JSON文字列"""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return json.dumps(value, ensure_ascii=False)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return json.loads(value)
+
+
+class JSONEncodedVector(TypeDecorator):
+    """埋め込みベクトル(ndarray/list) <-> JSON文字列"""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        return json.dumps([float(v) for v in value])
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return np.asarray(json.loads(value), dtype=np.float32)
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, String, Integer, Date, ARRAY, Text, Float
+from sqlalchemy import (
+    Column, String, Integer, SmallInteger, Date, ARRAY, Text, Float,
+    Table, ForeignKey,
+)
 from sqlalchemy.dialects.postgresql import UUID
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.orm import deferred, relationship
+from pgvector.sqlalchemy import HALFVEC
 import uuid
 from datetime import date
 from app.core.database import Base
+from app.models.types import JSONEncodedList, JSONEncodedVector
 
 
 class WardrobeItem(Base):
@@ -11,6 +16,8 @@ class WardrobeItem(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     image_path = Column(Text, nullable=False)
+    # 画像内容のSHA-256（重複検出用）
+    content_hash = Column(String(64), index=True)
 
     # 衣類属性
     category = Column(String(50), nullable=False)  # トップス、ボトムス、アウター等
@@ -25,21 +32,52 @@ class WardrobeItem(Base):
     last_worn = Column(Date)
     wear_count = Column(Integer, default=0)
 
-    # タグ
-    season_tags = Column(ARRAY(Text))  # ['春', '夏']
-    style_tags = Column(ARRAY(Text))  # ['カジュアル', 'フォーマル']
+    # タグ（SQLite実行時はJSON文字列として格納）
+    season_tags = Column(
+        ARRAY(Text).with_variant(JSONEncodedList(), "sqlite")
+    )  # ['春', '夏']
+    style_tags = Column(
+        ARRAY(Text).with_variant(JSONEncodedList(), "sqlite")
+    )  # ['カジュアル', 'フォーマル']
 
     # お手入れ情報
     care_instructions = Column(Text)
 
     # ベクトル埋め込み (CLIP embedding - 768次元)
-    # pgvector拡張が必要
-    vector_embedding = Column(Vector(768))
+    # pgvector拡張が必要。halfvec(FP16)で格納しメモリ帯域を半減
+    # （書き込み側はfloat16にキャストしてからINSERTすること）
+    # デフォルトdeferred: REST系クエリで1536バイト/行を転送しないため。
+    # 類似検索側は .options(undefer(WardrobeItem.vector_embedding)) で取得する
+    vector_embedding = deferred(
+        Column(HALFVEC(768).with_variant(JSONEncodedVector(), "sqlite"))
+    )
 
     def __repr__(self):
         return f"<WardrobeItem {self.id} - {self.category}>"
 
 
+# コーディネートと衣類のM:N中間テーブル。
+# ARRAY(UUID)と違いFK整合性が効き、item→outfitの逆引きも
+# インデックススキャンで済む
+outfit_items = Table(
+    "outfit_items",
+    Base.metadata,
+    Column(
+        "outfit_id",
+        UUID(as_uuid=True),
+        ForeignKey("outfits.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "item_id",
+        UUID(as_uuid=True),
+        ForeignKey("wardrobe.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("position", SmallInteger),
+)
+
+
 class Outfit(Base):
     __tablename__ = "outfits"
 
@@ -47,8 +85,21 @@ class Outfit(Base):
     created_at = Column(Date, default=date.today)
     worn_date = Column(Date)
 
-    # コーディネートアイテムのID配列
-    item_ids = Column(ARRAY(UUID(as_uuid=True)))
+    # コーディネート構成アイテム。
+    # lazy='raise_on_sql'で暗黙のlazy load（=N+1）を禁止し、
+    # ルート側の .options(selectinload(Outfit.items)) を必須にする
+    items = relationship(
+        "WardrobeItem",
+        secondary=outfit_items,
+        lazy="raise_on_sql",
+        order_by=outfit_items.c.position,
+        passive_deletes=True,
+    )
+
+    @property
+    def item_ids(self):
+        """構成アイテムのID一覧（itemsがロード済みであること）"""
+        return [item.id for item in self.items]
 
     # その日の天気・予定
     weather_temp = Column(Float)
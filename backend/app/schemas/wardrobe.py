@@ -0,0 +1,86 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from uuid import UUID
+from datetime import date
+
+
+class WardrobeItemBase(BaseModel):
+    """衣類アイテムの共通属性"""
+    category: str
+    color_primary: Optional[str] = None
+    color_secondary: Optional[str] = None
+    pattern: Optional[str] = None
+    material: Optional[str] = None
+    brand: Optional[str] = None
+    purchase_date: Optional[date] = None
+    season_tags: Optional[list[str]] = None
+    style_tags: Optional[list[str]] = None
+    care_instructions: Optional[str] = None
+
+
+class WardrobeItemCreate(WardrobeItemBase):
+    image_path: str
+
+
+class WardrobeItemUpdate(BaseModel):
+    """部分更新用（全フィールド任意）"""
+    category: Optional[str] = None
+    color_primary: Optional[str] = None
+    color_secondary: Optional[str] = None
+    pattern: Optional[str] = None
+    material: Optional[str] = None
+    brand: Optional[str] = None
+    purchase_date: Optional[date] = None
+    season_tags: Optional[list[str]] = None
+    style_tags: Optional[list[str]] = None
+    care_instructions: Optional[str] = None
+
+
+class WardrobeItemResponse(WardrobeItemBase):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    image_path: str
+    last_worn: Optional[date] = None
+    wear_count: int = 0
+
+
+class WardrobeItemPage(BaseModel):
+    """keysetページネーション用レスポンス"""
+    items: list[WardrobeItemResponse]
+    next_cursor: Optional[UUID] = None
+
+
+class OutfitCreate(BaseModel):
+    """コーディネート登録"""
+    item_ids: list[UUID]
+    worn_date: Optional[date] = None
+    weather_temp: Optional[float] = None
+    weather_condition: Optional[str] = None
+    occasion: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class OutfitResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    created_at: date
+    worn_date: Optional[date] = None
+    item_ids: list[UUID]
+    weather_temp: Optional[float] = None
+    weather_condition: Optional[str] = None
+    occasion: Optional[str] = None
+    user_rating: Optional[int] = None
+    notes: Optional[str] = None
+
+
+class OutfitPage(BaseModel):
+    """keysetページネーション用レスポンス"""
+    items: list[OutfitResponse]
+    next_cursor: Optional[UUID] = None
+
+
+class OutfitDetail(OutfitResponse):
+    """アイテム詳細を含むコーディネート"""
+    items: list[WardrobeItemResponse] = []
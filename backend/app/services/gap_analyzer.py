@@ -0,0 +1,338 @@
+"""
+ワードローブギャップ分析サービス
+
+手持ち衣類の構成を分析し、基本アイテムの不足・スタイル別/季節別
+カバレッジ・着回し組み合わせ数を算出する。
+"""
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numbaなしでも動作させる（JITされない素の関数として実行）
+    def njit(**kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+@njit(cache=True)
+def _combined_gap_score(
+    style_coverages: np.ndarray,
+    season_coverages: np.ndarray,
+    filled: float,
+    required: float,
+) -> float:
+    """ギャップスコアの数値計算部
+
+    タイトな数値ループだけを切り出してJIT対象にする
+    （cache=Trueで初回コンパイル結果をディスクに保存し、
+    ワーカー再起動時の再コンパイルを避ける）。
+    文字列処理の多い推奨リスト生成はPython側に残す。
+    """
+    essential_score = filled * 100.0 / required if required > 0 else 0.0
+
+    style_score = 0.0
+    for coverage in style_coverages:
+        style_score += min(coverage, 30.0) / 30.0 * 100.0
+    if style_coverages.size:
+        style_score /= style_coverages.size
+
+    season_score = 0.0
+    for coverage in season_coverages:
+        season_score += min(coverage, 30.0) / 30.0 * 100.0
+    if season_coverages.size:
+        season_score /= season_coverages.size
+
+    return essential_score * 0.5 + style_score * 0.25 + season_score * 0.25
+
+
+class WardrobeGapAnalyzer:
+    """ワードローブの不足分析クラス
+
+    wardrobe_itemsはDB行を辞書化したもの
+    （category, color_primary, style_tags, season_tags等のキーを持つ）。
+    """
+
+    # カテゴリ毎の基本アイテムと推奨本数
+    ESSENTIAL_ITEMS = {
+        "トップス": {
+            "白シャツ": {"count": 2},
+            "Tシャツ": {"count": 3},
+            "ニット": {"count": 2},
+        },
+        "ボトムス": {
+            "デニム": {"count": 2},
+            "スラックス": {"count": 1},
+            "チノパン": {"count": 1},
+        },
+        "アウター": {
+            "ジャケット": {"count": 1},
+            "コート": {"count": 1},
+        },
+        "シューズ": {
+            "スニーカー": {"count": 1},
+            "革靴": {"count": 1},
+        },
+    }
+
+    # 季節毎の代表アイテム
+    SEASONAL_ITEMS = {
+        "春": ["薄手のカーディガン", "トレンチコート", "長袖シャツ"],
+        "夏": ["半袖Tシャツ", "ショートパンツ", "サンダル"],
+        "秋": ["ニット", "ジャケット", "ブーツ"],
+        "冬": ["コート", "セーター", "マフラー"],
+    }
+
+    STYLES = ("カジュアル", "フォーマル", "ビジネス", "スポーツ")
+    SEASONS = ("春", "夏", "秋", "冬")
+
+    # クラスロード時に平坦化した定数インデックス。
+    # 分析毎のESSENTIAL_ITEMS.items()二重ループとカテゴリ別リスト走査を
+    # 定数回のルックアップに置き換える
+    _ESSENTIAL_FLAT = tuple(
+        (cat, name, req["count"])
+        for cat, d in ESSENTIAL_ITEMS.items()
+        for name, req in d.items()
+    )
+    _ESSENTIAL_NAMES_BY_CAT = {
+        cat: tuple(d) for cat, d in ESSENTIAL_ITEMS.items()
+    }
+    _ESSENTIAL_CATS = frozenset(ESSENTIAL_ITEMS)
+
+    # 推奨文の ", ".join(...) を呼び出し毎に再実行しない
+    _SEASONAL_SUGGESTED = {
+        season: ", ".join(items) for season, items in SEASONAL_ITEMS.items()
+    }
+
+    # スタイル/季節のカバレッジ不足推奨はクラスロード時に組み立て済みの
+    # 定数dictを参照する（呼び出し毎のf-string整形とdict構築をしない）
+    _STYLE_REC = {
+        style: {
+            "item": f"{style}用アイテム",
+            "category": None,
+            "reason": f"{style}スタイルのアイテムが不足しています",
+            "priority": "medium",
+            "suggested": f"{style}に適したアイテムを追加",
+        }
+        for style in STYLES
+    }
+    _SEASON_REC = {
+        season: {
+            "item": f"{season}用アイテム",
+            "category": None,
+            "reason": f"{season}のアイテムが不足しています",
+            "priority": "medium",
+            "suggested": suggested,
+        }
+        for season, suggested in _SEASONAL_SUGGESTED.items()
+    }
+
+    def analyze(self, wardrobe_items: list) -> dict:
+        """ワードローブ全体を分析する
+
+        アイテム走査は1パスのみ。各Counterとカテゴリ別インデックスを
+        ここで構築し、個別の_analyze_*ヘルパーには生リストではなく
+        集計済みの中間結果を渡す（再走査しない）。
+        """
+        cat_counter: Counter = Counter()
+        color_counter: Counter = Counter()
+        style_counter: Counter = Counter()
+        season_counter: Counter = Counter()
+        essential_counter: Counter = Counter()
+
+        for item in wardrobe_items:
+            item_get = item.get
+            category = item_get("category", "その他")
+            cat_counter[category] += 1
+            if category in self._ESSENTIAL_CATS:
+                label = item_get("subcategory") or item_get("name") or ""
+                if label:
+                    for name in self._ESSENTIAL_NAMES_BY_CAT[category]:
+                        if name in label:
+                            essential_counter[name] += 1
+
+            color = item_get("color_primary")
+            if color:
+                color_counter[color] += 1
+            for style in item_get("style_tags") or ():
+                style_counter[style] += 1
+            for season in item_get("season_tags") or ():
+                season_counter[season] += 1
+
+        total = len(wardrobe_items)
+        category_distribution = self._analyze_category_distribution(
+            cat_counter, total
+        )
+        color_distribution = self._analyze_color_distribution(color_counter)
+        style_coverage = self._analyze_style_coverage(style_counter, total)
+        season_coverage = self._analyze_season_coverage(season_counter, total)
+        essentials = self._check_essential_items(cat_counter, essential_counter)
+        gap_score = self._calculate_gap_score(
+            style_coverage, season_coverage, essentials
+        )
+        recommendations = self._generate_recommendations(
+            essentials, style_coverage, season_coverage
+        )
+
+        return {
+            "total_items": total,
+            "category_distribution": category_distribution,
+            "color_distribution": color_distribution,
+            "style_coverage": style_coverage,
+            "season_coverage": season_coverage,
+            "essential_items": essentials,
+            "gap_score": gap_score,
+            "outfit_combinations": self.calculate_outfit_combinations(
+                wardrobe_items, cat_counter=cat_counter
+            ),
+            "recommendations": recommendations,
+        }
+
+    def _analyze_category_distribution(
+        self, cat_counter: Counter, total: int
+    ) -> dict:
+        """カテゴリ別の分布と偏り"""
+        if not cat_counter:
+            return {"distribution": {}, "most_common": None, "least_common": None}
+        # argmaxはC実装のCounter.most_common、argminは__getitem__キーで
+        # （.getのバウンドメソッド解決をイテレーション毎に払わない）
+        return {
+            "distribution": dict(cat_counter),
+            "most_common": cat_counter.most_common(1)[0][0],
+            "least_common": min(cat_counter, key=cat_counter.__getitem__),
+        }
+
+    def _analyze_color_distribution(self, color_counter: Counter) -> dict:
+        """色の分布と偏り"""
+        if not color_counter:
+            return {"distribution": {}, "most_common": None}
+        return {
+            "distribution": dict(color_counter),
+            "most_common": color_counter.most_common(1)[0][0],
+        }
+
+    def _analyze_style_coverage(
+        self, style_counter: Counter, total: int
+    ) -> dict:
+        """スタイル別カバレッジ（%）"""
+        coverage = {}
+        for style in self.STYLES:
+            count = style_counter[style]
+            coverage[style] = {
+                "count": count,
+                "coverage": round(count * 100 / total, 1) if total else 0.0,
+            }
+        return coverage
+
+    def _analyze_season_coverage(
+        self, season_counter: Counter, total: int
+    ) -> dict:
+        """季節別カバレッジ（%）"""
+        coverage = {}
+        for season in self.SEASONS:
+            count = season_counter[season]
+            coverage[season] = {
+                "count": count,
+                "coverage": round(count * 100 / total, 1) if total else 0.0,
+            }
+        return coverage
+
+    def _check_essential_items(
+        self, cat_counter: Counter, essential_counter: Counter
+    ) -> dict:
+        """基本アイテムの充足チェック
+
+        メインパスで集計済みのCounterと平坦化済みの_ESSENTIAL_FLATを
+        突き合わせるだけで、アイテムの再走査は発生しない。
+        """
+        result = {}
+        for category, name, need in self._ESSENTIAL_FLAT:
+            entry = result.get(category)
+            if entry is None:
+                entry = result[category] = {
+                    "total_in_category": cat_counter[category],
+                    "required": 0,
+                    "filled": 0,
+                    "missing": [],
+                }
+            actual = essential_counter[name]
+            entry["required"] += need
+            entry["filled"] += min(actual, need)
+            if actual < need:
+                entry["missing"].append({
+                    "item": name,
+                    "have": actual,
+                    "need": need,
+                })
+        return result
+
+    def _calculate_gap_score(
+        self, style_coverage: dict, season_coverage: dict, essentials: dict
+    ) -> float:
+        """充足度スコア (0-100、高いほど充実)"""
+        required = sum(e["required"] for e in essentials.values())
+        filled = sum(e["filled"] for e in essentials.values())
+        score = _combined_gap_score(
+            np.fromiter(
+                (d["coverage"] for d in style_coverage.values()),
+                dtype=np.float64,
+                count=len(style_coverage),
+            ),
+            np.fromiter(
+                (d["coverage"] for d in season_coverage.values()),
+                dtype=np.float64,
+                count=len(season_coverage),
+            ),
+            float(filled),
+            float(required),
+        )
+        return round(score, 1)
+
+    def _generate_recommendations(
+        self, essentials: dict, style_coverage: dict, season_coverage: dict
+    ) -> list:
+        """不足アイテムの購入推奨リスト"""
+        recommendations = []
+        for category, result in essentials.items():
+            for miss in result["missing"]:
+                recommendations.append({
+                    "item": miss["item"],
+                    "category": category,
+                    "reason": f"基本アイテム「{miss['item']}」が不足しています"
+                              f"（{miss['have']}/{miss['need']}）",
+                    "priority": "high",
+                })
+
+        # カバレッジ十分（共通ケース）では文字列整形を一切行わない。
+        # クラス共有の定数dictをそのまま返すと呼び出し側の変更が以降の
+        # 全分析に波及するため、境界で浅いコピーを渡す
+        recommendations.extend(
+            dict(self._STYLE_REC[style])
+            for style, data in style_coverage.items()
+            if data["coverage"] < 30
+        )
+        recommendations.extend(
+            dict(self._SEASON_REC[season])
+            for season, data in season_coverage.items()
+            if data["coverage"] < 30
+        )
+        return recommendations
+
+    def calculate_outfit_combinations(
+        self, wardrobe_items: list, cat_counter: Optional[Counter] = None
+    ) -> int:
+        """トップス×ボトムス×(アウター+1)の組み合わせ数"""
+        if cat_counter is None:
+            # dict.getの手書きループより、C実装のCounterに
+            # ジェネレータを渡す方がアイテムあたりのバイトコードが少ない
+            cat_counter = Counter(
+                item.get("category", "その他") for item in wardrobe_items
+            )
+        tops = cat_counter.get("トップス", 0)
+        bottoms = cat_counter.get("ボトムス", 0)
+        outers = cat_counter.get("アウター", 0)
+        return tops * bottoms * (outers + 1)
@@ -1,16 +1,250 @@
+import queue
+import sys
+
+import numpy as np
+from itertools import islice
+from pathlib import Path
+from threading import Thread
+
+from uuid import uuid4
+
+from celery import group
+from celery.signals import worker_process_init
+from sqlalchemy import insert
+
 from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.models.wardrobe import WardrobeItem
+
+# mlパッケージの解決:
+# docker-composeでは ./ml が /ml にマウントされるため / をsys.pathに、
+# リポジトリ直下での実行時はリポジトリルートをsys.pathに追加する
+_ML_PARENT = (
+    Path("/") if Path("/ml/image_processing").exists()
+    else Path(__file__).resolve().parents[3]
+)
+if str(_ML_PARENT) not in sys.path:
+    sys.path.insert(0, str(_ML_PARENT))
+
+# MLモデルラッパーはプロセス生存期間のシングルトン。
+# タスク毎に構築するとYOLO/CLIP/rembgの重みロード（数秒+数百MB）を
+# 画像1枚ごとに払うことになるため、ワーカープロセス初期化時に1度だけ
+# ロードして全タスクで使い回す
+_bg_remover = None
+_detector = None
+_embedder = None
+_attr_extractor = None
+
+
+@worker_process_init.connect
+def init_ml_models(**kwargs):
+    """Celeryワーカープロセス起動時にMLモデルを1度だけロードする"""
+    global _bg_remover, _detector, _embedder, _attr_extractor
+    from ml.image_processing.background_remover import BackgroundRemover
+    from ml.image_processing.detector import ClothingDetector
+    from ml.image_processing.embedder import ImageEmbedder
+    from ml.image_processing.attribute_extractor import AttributeExtractor
+
+    _bg_remover = BackgroundRemover()
+    _detector = ClothingDetector()
+    _embedder = ImageEmbedder()
+    # CLIPの重みを二重ロードしないようembedderを共有する
+    _attr_extractor = AttributeExtractor(embedder=_embedder)
+
+
+def _get_models():
+    """モデル群を返す（eager実行やテストでは遅延初期化）"""
+    if _embedder is None:
+        init_ml_models()
+    return _bg_remover, _detector, _embedder, _attr_extractor
 
 
 @celery_app.task
-def process_image_task(image_path: str):
+def process_image_task(image_path: str, content_hash: str = None):
+    """画像処理タスク（アップロードエンドポイントからの入口）"""
+    return process_clothing_image(image_path, content_hash)
+
+
+@celery_app.task
+def process_clothing_image(image_path: str, content_hash: str = None):
     """
-    画像処理タスク
-    Phase 2で実装予定：YOLO, CLIP, rembgによる衣類認識
+    画像処理パイプライン:
+    背景除去 → 衣類検出 → 属性抽出 → ベクトル化 → DB登録
+
+    content_hashはアップロード時に計算済みのSHA-256。重複検出クエリの
+    ためWardrobeItemに永続化する。
     """
+    bg_remover, detector, embedder, attr_extractor = _get_models()
+
+    # 背景除去結果はディスクに書き戻さず（PNGエンコード+デコード+I/Oを
+    # 節約）、白背景合成済みのPIL Imageのまま後段3ステージで共有する
+    rgba = bg_remover.remove_background(image_path)
+    image = bg_remover.create_white_background(rgba)
+
+    detection = detector.detect(image)
+    # 埋め込みは1回だけ計算し、属性抽出側へ渡して共有する
+    # （extract_all_attributes内部の2回目のvision forwardを省く）
+    embedding = embedder.embed(image)
+    attributes = attr_extractor.extract_all_attributes(
+        image, embedding=embedding
+    )
+
+    category = (
+        detection.get("category") or attributes.get("category") or "その他"
+    )
+    db = SessionLocal()
+    try:
+        # add→commit→refresh（refreshは全カラム再SELECT）ではなく
+        # INSERT ... RETURNING id の1往復で登録する
+        new_id = db.execute(
+            insert(WardrobeItem)
+            .values(
+                id=uuid4(),
+                image_path=image_path,
+                content_hash=content_hash,
+                category=category,
+                color_primary=attributes.get("color_primary"),
+                color_secondary=attributes.get("color_secondary"),
+                pattern=attributes.get("pattern"),
+                material=attributes.get("material"),
+                season_tags=attributes.get("season_tags"),
+                # Pythonのfloatオブジェクト化(.tolist())を避け、float32の
+                # ndarrayのままpgvectorのバインドに渡す（帯域・GC削減）
+                vector_embedding=np.ascontiguousarray(
+                    embedding, dtype=np.float32
+                ),
+            )
+            .returning(WardrobeItem.id)
+        ).scalar_one()
+        db.commit()
+        return {
+            "status": "completed",
+            "item_id": str(new_id),
+            "category": category,
+            "confidence": detection.get("confidence"),
+        }
+    finally:
+        db.close()
+
+
+# GPUスループットはバッチ8-64で飽和する。1枚ずつの推論(batch=1)は
+# GPU使用率~10%に留まるため、このサイズでまとめて前向き計算する
+_BATCH_CHUNK = 16
+
+# 推論側のサブバッチサイズと、背景除去→推論間のキュー深さ。
+# キューを有限にして先行しすぎた背景除去がメモリを食い潰すのを防ぐ
+_INFER_SUB_BATCH = 8
+_PIPELINE_QUEUE_SIZE = 4
+
+
+@celery_app.task
+def process_clothing_image_batch(image_paths: list):
+    """
+    複数画像をまとめて処理するタスク
+
+    CPUバウンドの背景除去はプロデューサスレッドで先行実行し、
+    メインスレッドの検出・埋め込み（バッチ前向き計算）と
+    パイプライン的にオーバーラップさせる。スループットは
+    sum(CPUステージ, GPUステージ)ではなくmax(...)で決まる。
+    DB登録は最後にbulk insert + 1回のcommit。
+    """
+    bg_remover, detector, embedder, attr_extractor = _get_models()
+
+    # 背景除去(CPU)→推論(GPU)の橋渡しキュー。Noneが終端
+    pipeline: queue.Queue = queue.Queue(maxsize=_PIPELINE_QUEUE_SIZE)
+
+    # 前処理に失敗した画像（欠損・破損ファイル等）。スキップして記録する
+    failures = []
+
+    def _produce():
+        # 例外でプロデューサが死んでも終端Noneは必ず入れる。
+        # さもないとコンシューマがpipeline.get()で永久にブロックし
+        # ワーカーがハングする
+        try:
+            for path in image_paths:
+                try:
+                    # ディスク書き戻しなしでメモリ上のPIL Imageを後段へ渡す
+                    rgba = bg_remover.remove_background(path)
+                    image = bg_remover.create_white_background(rgba)
+                except Exception as exc:
+                    failures.append({"image_path": path, "error": str(exc)})
+                    continue
+                pipeline.put((path, image))
+        finally:
+            pipeline.put(None)
+
+    producer = Thread(target=_produce, daemon=True)
+    producer.start()
+
+    rows = []
+
+    def _infer(pending):
+        images = [image for _, image in pending]
+        detections = detector.batch_detect(images)
+        embeddings = embedder.batch_embed(images)
+        for (path, image), detection, embedding in zip(
+            pending, detections, embeddings
+        ):
+            # バッチ計算済みの埋め込みを渡し、画像毎の再forwardを省く
+            attributes = attr_extractor.extract_all_attributes(
+                image, embedding=embedding
+            )
+            rows.append({
+                "id": uuid4(),
+                "image_path": path,
+                "category": detection.get("category")
+                or attributes.get("category")
+                or "その他",
+                "color_primary": attributes.get("color_primary"),
+                "color_secondary": attributes.get("color_secondary"),
+                "pattern": attributes.get("pattern"),
+                "material": attributes.get("material"),
+                "season_tags": attributes.get("season_tags"),
+                "vector_embedding": np.ascontiguousarray(
+                    embedding, dtype=np.float32
+                ),
+            })
+
+    pending = []
+    while (item := pipeline.get()) is not None:
+        pending.append(item)
+        if len(pending) >= _INFER_SUB_BATCH:
+            _infer(pending)
+            pending = []
+    if pending:
+        _infer(pending)
+    producer.join()
+
+    db = SessionLocal()
+    try:
+        # 全行を1つのINSERT文（executemany）で登録
+        if rows:
+            db.execute(insert(WardrobeItem), rows)
+            db.commit()
+        return {"status": "completed", "count": len(rows), "failed": failures}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def batch_process_images(image_paths: list):
+    """複数画像の一括処理（チャンク毎にバッチタスクへ振り分け）
+
+    チャンク毎の.delay()（ブローカー往復×チャンク数）ではなく
+    1つのgroupとして投入し、結果バックエンドにも集約された
+    GroupResult 1件だけを持たせる。
+    """
+    paths = iter(image_paths)
+    signatures = []
+    while chunk := list(islice(paths, _BATCH_CHUNK)):
+        signatures.append(process_clothing_image_batch.s(chunk))
+    if not signatures:
+        return {"status": "dispatched", "group_id": None, "task_count": 0}
+    job = group(signatures).apply_async()
     return {
-        "status": "pending",
-        "message": "Image processing to be implemented in Phase 2",
-        "image_path": image_path
+        "status": "dispatched",
+        "group_id": job.id,
+        "task_count": len(signatures),
     }
 
 
@@ -0,0 +1,277 @@
+"""
+天気情報取得サービス (OpenWeatherMap API)
+"""
+import httpx
+import numpy as np
+import orjson
+import requests
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from typing import Callable, Optional
+from urllib3.util.retry import Retry
+from app.core.config import settings
+
+# モジュールレベルで共有するHTTPセッション。
+# Celeryワーカー内のタスク間でTCP+TLS接続を使い回す。
+# コネクションプール＋軽いリトライ付き
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    ),
+)
+
+# (endpoint, city, country_code, ...) → (expires_at, data) のTTLキャッシュ。
+# キャッシュヒット時はネットワークRTTゼロでマイクロ秒応答になる
+_cache: dict = {}
+_cache_lock = threading.Lock()
+
+# 現在天気は10分、予報は1時間キャッシュ
+_TTL_CURRENT = 600
+_TTL_FORECAST = 3600
+
+# 雨具が必要な天候。list `in` と違いfrozensetはO(1)ルックアップ
+_RAIN_SET = frozenset({"Rain", "Drizzle", "Thunderstorm"})
+
+# 気温5℃刻みのバケット表。if/elifカスケードの代わりに
+# min(max(int(temp // 5), 0), 5) でインデックスを引く
+# （<5 / <10 / <15 / <20 / <25 / それ以上 の6段階）
+_MATERIALS_BY_BUCKET = (
+    "ウール、ダウン",
+    "ウール、フリース",
+    "綿、ウール",
+    "綿、ポリエステル",
+    "綿",
+    "リネン、薄手の綿",
+)
+_STYLE_BY_BUCKET = (
+    "厚手のコート、マフラー、手袋",
+    "コート、ニット",
+    "ジャケット、薄手のニット",
+    "カーディガン、長袖シャツ",
+    "長袖または半袖シャツ",
+    "半袖、薄手の服",
+)
+
+
+@lru_cache(maxsize=64)
+def _clothing_recommendation(temp_bucket: int, condition: str) -> dict:
+    """(気温バケット, 天候)から服装指針を組み立てる純粋関数
+
+    バケット2以下 ⇔ 気温15℃未満なのでアウター判定もバケットで決まる。
+    """
+    rain = condition in _RAIN_SET
+    return {
+        "materials": _MATERIALS_BY_BUCKET[temp_bucket],
+        "style": _STYLE_BY_BUCKET[temp_bucket],
+        "outer_recommended": temp_bucket < 3 or rain,
+        "rain_gear": rain,
+    }
+
+
+def _cached(key: tuple, ttl: int, fetch: Callable[[], object]):
+    """TTL付きでfetch結果をキャッシュする（失敗時は何も保存しない）"""
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+    value = fetch()
+    with _cache_lock:
+        _cache[key] = (now + ttl, value)
+    return value
+
+
+class WeatherService:
+    """OpenWeatherMap APIクライアント"""
+
+    BASE_URL = "https://api.openweathermap.org/data/2.5"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or settings.OPENWEATHER_API_KEY
+
+    def get_current_weather(self, city: str, country_code: str = "JP") -> dict:
+        """現在の天気を取得（10分TTLキャッシュ）"""
+        return _cached(
+            ("current", city, country_code),
+            _TTL_CURRENT,
+            lambda: self._fetch_current(city, country_code),
+        )
+
+    def _fetch_current(self, city: str, country_code: str) -> dict:
+        response = _session.get(
+            f"{self.BASE_URL}/weather",
+            params=self._query_params(city, country_code),
+            timeout=10,
+        )
+        response.raise_for_status()
+        # stdlib jsonより5-10倍速いorjsonでデコード
+        return self._parse_current_data(orjson.loads(response.content))
+
+    def _query_params(self, city: str, country_code: str) -> dict:
+        return {
+            "q": f"{city},{country_code}",
+            "appid": self.api_key,
+            "units": "metric",
+            "lang": "ja",
+        }
+
+    @staticmethod
+    def _parse_current_data(data: dict) -> dict:
+        return {
+            "temperature": data["main"]["temp"],
+            "feels_like": data["main"]["feels_like"],
+            "condition": data["weather"][0]["main"],
+            "description": data["weather"][0]["description"],
+            "humidity": data["main"]["humidity"],
+            "wind_speed": data["wind"]["speed"],
+        }
+
+    def get_forecast(
+        self, city: str, days: int = 5, country_code: str = "JP"
+    ) -> list:
+        """日別予報を取得（3時間毎予報を日単位に集約、1時間TTLキャッシュ）"""
+        return _cached(
+            ("forecast", city, country_code, days),
+            _TTL_FORECAST,
+            lambda: self._fetch_forecast(city, days, country_code),
+        )
+
+    def _fetch_forecast(self, city: str, days: int, country_code: str) -> list:
+        response = _session.get(
+            f"{self.BASE_URL}/forecast",
+            params=self._query_params(city, country_code),
+            timeout=10,
+        )
+        response.raise_for_status()
+        return self._parse_forecast_data(orjson.loads(response.content), days)
+
+    def _parse_forecast_data(self, data: dict, days: int) -> list:
+        """3時間毎スロットを日単位に集約する
+
+        日毎の平均/最小/最大はPythonのsum/min/maxではなくNumPyの
+        C実装リダクション1回ずつで計算する。
+        """
+        by_date: dict = defaultdict(
+            lambda: {"temps": [], "humidity": [], "wind": [], "conditions": []}
+        )
+        for entry in data.get("list", []):
+            day = entry["dt_txt"].split(" ")[0]
+            values = by_date[day]
+            values["temps"].append(entry["main"]["temp"])
+            values["humidity"].append(entry["main"]["humidity"])
+            values["wind"].append(entry["wind"]["speed"])
+            values["conditions"].append(entry["weather"][0]["main"])
+
+        forecast = []
+        for day, values in list(by_date.items())[:days]:
+            temps = np.asarray(values["temps"], dtype=np.float32)
+            humidity = np.asarray(values["humidity"], dtype=np.float32)
+            wind = np.asarray(values["wind"], dtype=np.float32)
+            # O(k^2)のset+list.countではなくC実装のCounterで最頻値を取る
+            condition = Counter(values["conditions"]).most_common(1)[0][0]
+            forecast.append({
+                "date": day,
+                "temp_avg": round(float(temps.mean()), 1),
+                "temp_min": round(float(temps.min()), 1),
+                "temp_max": round(float(temps.max()), 1),
+                "humidity": round(float(humidity.mean()), 1),
+                "wind_speed": round(float(wind.mean()), 1),
+                "condition": condition,
+            })
+        return forecast
+
+    def get_clothing_recommendation(self, temp: float, condition: str) -> dict:
+        """気温・天候から服装の指針を返す
+
+        if/elifカスケードではなく5℃刻みのテーブル参照＋lru_cacheで、
+        呼び出し毎の分岐・dict構築コストを払わない。
+        """
+        temp_bucket = min(max(int(temp // 5), 0), 5)
+        # キャッシュ済みdictを呼び出し側の変更から守るため浅いコピーを返す
+        return dict(_clothing_recommendation(temp_bucket, condition))
+
+
+# FastAPIのイベントループから使う共有AsyncClient。
+# リクエスト毎に生成せず、keep-aliveされたコネクションを使い回す
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(
+                max_keepalive_connections=8, max_connections=32
+            ),
+        )
+    return _async_client
+
+
+async def _cached_async(key: tuple, ttl: int, fetch) -> object:
+    """_cachedのasync版（同じTTLキャッシュを共有する）"""
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+    value = await fetch()
+    with _cache_lock:
+        _cache[key] = (now + ttl, value)
+    return value
+
+
+class AsyncWeatherService(WeatherService):
+    """OpenWeatherMap APIの非同期クライアント
+
+    blocking requestsと違いイベントループを塞がないため、FastAPIの
+    エンドポイントから現在天気と予報を
+    `await asyncio.gather(svc.get_current_weather(...), svc.get_forecast(...))`
+    で並行取得でき、レイテンシは2リクエストの合計ではなくmaxになる。
+    パース処理・TTLキャッシュは同期版と共有する。
+    """
+
+    async def get_current_weather(
+        self, city: str, country_code: str = "JP"
+    ) -> dict:
+        """現在の天気を取得（10分TTLキャッシュ）"""
+        return await _cached_async(
+            ("current", city, country_code),
+            _TTL_CURRENT,
+            lambda: self._fetch_current_async(city, country_code),
+        )
+
+    async def _fetch_current_async(self, city: str, country_code: str) -> dict:
+        response = await _get_async_client().get(
+            f"{self.BASE_URL}/weather",
+            params=self._query_params(city, country_code),
+        )
+        response.raise_for_status()
+        return self._parse_current_data(orjson.loads(response.content))
+
+    async def get_forecast(
+        self, city: str, days: int = 5, country_code: str = "JP"
+    ) -> list:
+        """日別予報を取得（1時間TTLキャッシュ）"""
+        return await _cached_async(
+            ("forecast", city, country_code, days),
+            _TTL_FORECAST,
+            lambda: self._fetch_forecast_async(city, days, country_code),
+        )
+
+    async def _fetch_forecast_async(
+        self, city: str, days: int, country_code: str
+    ) -> list:
+        response = await _get_async_client().get(
+            f"{self.BASE_URL}/forecast",
+            params=self._query_params(city, country_code),
+        )
+        response.raise_for_status()
+        return self._parse_forecast_data(orjson.loads(response.content), days)
@@ -0,0 +1,275 @@
+"""
+pytest共通フィクスチャ
+
+本番はPostgreSQL + pgvectorだが、テストはSQLite in-memoryで実行する。
+PostgreSQL固有型（UUID/ARRAY）はSQLite向けに文字列型へマッピングし、
+バインド値の互換変換はカラム型側（app.models.typesのwith_variant）が担う。
+
+スキーマ構築（create_all）はセッションで1度だけ行い、各テストは
+トランザクション＋SAVEPOINTに参加して終了時にロールバックする。
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# アプリ本体のengine（get_dbで差し替えるため実際には使われない）向け。
+# :memory:だとpool_size指定と衝突するためファイルURLにしておく
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{Path(tempfile.gettempdir()) / 'wardrobe_test_app.db'}",
+)
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+# app/mlパッケージの解決はpytest.iniのpythonpathで行う
+
+from sqlalchemy import ARRAY, create_engine, event  # noqa: E402
+from sqlalchemy.dialects.postgresql import UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+
+# --- SQLite向け型マッピング（PostgreSQL固有型の互換定義） ---
+# TypeCompilerへのメソッド差し込みではなく@compilesで登録する。
+# SQLAlchemyのコンパイラキャッシュに乗るため文書化された正攻法で同速
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(element, compiler, **kw):
+    return "CHAR(36)"
+
+
+@compiles(ARRAY, "sqlite")
+def _compile_array_sqlite(element, compiler, **kw):
+    return "TEXT"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.database import Base, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.wardrobe import WardrobeItem  # noqa: E402
+
+# sessionmakerはセッションで1度だけ構築し、テスト毎は
+# bind（トランザクション参加済みconnection）の指定のみ行う
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """セッションで共有するSQLite in-memoryエンジン
+
+    バインド値の互換変換（UUID/配列/ベクトル）はカラム型側
+    （app.models.typesのwith_variant）が担うため、ステートメント毎の
+    before_cursor_executeフックは持たない。
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # pysqliteは暗黙トランザクション管理がSAVEPOINTと噛み合わないため、
+    # ドライバの自動BEGINを無効化してSQLAlchemy側でBEGINを発行する
+    # （公式ドキュメントの"Serializable isolation / Savepoints"レシピ）
+    @event.listens_for(engine, "connect")
+    def _do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _do_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def _create_schema(engine):
+    """スキーマDDLはセッションで1度だけ発行する
+
+    autouseにしない：db_sessionが明示的に依存しているため、
+    -m no_db の実行ではエンジン構築もDDLも一切走らない。
+    """
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db_session(engine, _create_schema):
+    """テスト毎にトランザクションへ参加し、終了時にロールバックする
+
+    エンドポイント内のcommit()はSAVEPOINTのrelease扱いになるため、
+    テスト間でデータは残らない（DDL再発行も不要）。
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = TestingSessionLocal(
+        bind=connection, join_transaction_mode="create_savepoint"
+    )
+    yield db
+    db.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def _test_client():
+    """ASGI lifespan込みのTestClient起動はセッションで1度だけ行う"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def client(_test_client, db_session):
+    """get_dbをテストセッションに差し替えた共有TestClient"""
+
+    def _get_test_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = _get_test_db
+    yield _test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(autouse=True)
+def _seed():
+    """グローバルPRNGをテスト毎に固定seedへ戻す
+
+    乱数入力を決定的にしておくと、埋め込みメモ化（下記）のような
+    「同一入力→同一出力」前提のキャッシュが再実行間でも効く。
+    """
+    import random
+
+    import numpy as np
+
+    random.seed(0)
+    np.random.seed(0)
+
+
+# パス入力の埋め込みは決定的（同一ファイル→同一ベクトル）なので、
+# テスト実行中はパス毎に1度だけ計算して使い回す。
+# ネスト定義だとreload時にキャッシュが迷子になるためモジュールスコープに置く
+_embed_cache: dict = {}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _memoize_embeddings():
+    """ImageEmbedder.embedをパス入力に限りメモ化する"""
+    from ml.image_processing.embedder import ImageEmbedder
+
+    original = ImageEmbedder.embed
+
+    def cached_embed(self, image):
+        if isinstance(image, str):
+            key = (id(self), image)
+            hit = _embed_cache.get(key)
+            if hit is None:
+                hit = _embed_cache[key] = original(self, image)
+            return hit
+        return original(self, image)
+
+    ImageEmbedder.embed = cached_embed
+    yield
+    ImageEmbedder.embed = original
+    _embed_cache.clear()
+
+
+# MLラッパーはインポート自体が重い（CLIP/YOLO/rembgを引き込む）ため、
+# モジュールトップではなくフィクスチャ内で遅延インポートし、
+# インスタンスはセッションで1度だけ構築して全テストで共有する
+
+
+@pytest.fixture(scope="session")
+def embedder():
+    from ml.image_processing.embedder import ImageEmbedder
+
+    return ImageEmbedder()
+
+
+@pytest.fixture(scope="session")
+def detector():
+    from ml.image_processing.detector import ClothingDetector
+
+    return ClothingDetector()
+
+
+@pytest.fixture(scope="session")
+def bg_remover():
+    from ml.image_processing.background_remover import BackgroundRemover
+
+    return BackgroundRemover()
+
+
+@pytest.fixture(scope="session")
+def attribute_extractor(embedder):
+    from ml.image_processing.attribute_extractor import AttributeExtractor
+
+    # CLIP相当の埋め込みを二重構築しないようembedderを共有
+    return AttributeExtractor(embedder=embedder)
+
+
+@pytest.fixture(scope="session")
+def sample_wardrobe_item():
+    """ワードローブアイテム登録ペイロード
+
+    セッションで共有するためテスト側は変更前に dict(...) でコピーすること。
+    """
+    return {
+        "image_path": "uploads/sample.jpg",
+        "category": "トップス",
+        "color_primary": "白",
+        "pattern": "無地",
+        "material": "綿",
+    }
+
+
+@pytest.fixture(scope="session")
+def sample_outfit():
+    """コーディネート登録ペイロード（item_idsは呼び出し側でdict(...)に設定）"""
+    return {
+        "occasion": "仕事",
+        "weather_temp": 18.5,
+        "weather_condition": "Clear",
+    }
+
+
+@pytest.fixture
+def make_item(db_session, sample_wardrobe_item):
+    """WardrobeItem行をORMで直接seedするファクトリ
+
+    登録API自体を検証しないテストでは、POST毎のASGIスタック
+    （ルーティング・バリデーション・JSON変換）を通さずDBへ直接
+    書き込む。書き込みはテスト毎のトランザクション内なので巻き戻る。
+    """
+
+    def _make(**overrides):
+        item = WardrobeItem(**{**sample_wardrobe_item, **overrides})
+        db_session.add(item)
+        db_session.commit()
+        return str(item.id)
+
+    return _make
+
+
+@pytest.fixture
+def wardrobe_items(make_item):
+    """コーディネート系テストで使う登録済みアイテム2点（トップス+ボトムス）
+
+    各テストで重複していたアイテム作成ボイラープレートをここに集約する。
+    """
+    return [make_item(), make_item(category="ボトムス", color_primary="紺")]
+
+
+@pytest.fixture(scope="session")
+def sample_image(tmp_path_factory):
+    """テスト用JPEG画像
+
+    テスト側は読むだけなので、JPEGエンコード+書き込みは
+    セッションで1度だけ行う。
+    """
+    from PIL import Image
+
+    path = tmp_path_factory.mktemp("images") / "sample.jpg"
+    Image.new("RGB", (64, 64), (120, 90, 60)).save(path)
+    return str(path)
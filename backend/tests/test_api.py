@@ -0,0 +1,279 @@
+"""
+APIエンドポイントのテスト
+"""
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.models.wardrobe import WardrobeItem
+
+
+class TestHealth:
+    def test_root(self, client):
+        response = client.get("/")
+        assert response.status_code == 200
+        assert response.json()["status"] == "running"
+
+    def test_health(self, client):
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json() == {"status": "healthy"}
+
+    def test_health_detail_database(self, client):
+        response = client.get("/api/v1/health")
+        assert response.status_code == 200
+        assert response.json()["database"] == "connected"
+
+
+class TestWardrobe:
+    def test_create_item(self, client, sample_wardrobe_item):
+        response = client.post("/api/v1/wardrobe", json=sample_wardrobe_item)
+        assert response.status_code == 201
+        data = response.json()
+        assert data["category"] == "トップス"
+        assert data["color_primary"] == "白"
+        assert data["wear_count"] == 0
+        assert "id" in data
+
+    def test_get_item(self, client, sample_wardrobe_item):
+        created = client.post(
+            "/api/v1/wardrobe", json=sample_wardrobe_item
+        ).json()
+        response = client.get(f"/api/v1/wardrobe/{created['id']}")
+        assert response.status_code == 200
+        assert response.json()["id"] == created["id"]
+
+    def test_get_item_not_found(self, client):
+        response = client.get(f"/api/v1/wardrobe/{uuid4()}")
+        assert response.status_code == 404
+
+    def test_list_items(self, client, sample_wardrobe_item):
+        client.post("/api/v1/wardrobe", json=sample_wardrobe_item)
+        response = client.get("/api/v1/wardrobe")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 1
+        assert data["next_cursor"] is None
+
+    def test_list_items_category_filter(self, client, make_item):
+        make_item()
+        make_item(category="ボトムス")
+
+        response = client.get("/api/v1/wardrobe", params={"category": "ボトムス"})
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert len(items) == 1
+        assert items[0]["category"] == "ボトムス"
+
+    def test_pagination(self, client, db_session, sample_wardrobe_item):
+        # 25件のseedはINSERT文1回にまとめる（per-item add/commitを避ける）
+        db_session.bulk_insert_mappings(
+            WardrobeItem,
+            [dict(sample_wardrobe_item, brand=f"brand-{i}") for i in range(25)],
+        )
+        db_session.commit()
+
+        first = client.get("/api/v1/wardrobe", params={"limit": 10}).json()
+        assert len(first["items"]) == 10
+        assert first["next_cursor"] is not None
+
+        second = client.get(
+            "/api/v1/wardrobe",
+            params={"limit": 10, "cursor": first["next_cursor"]},
+        ).json()
+        assert len(second["items"]) == 10
+        first_ids = {item["id"] for item in first["items"]}
+        assert first_ids.isdisjoint(item["id"] for item in second["items"])
+
+        third = client.get(
+            "/api/v1/wardrobe",
+            params={"limit": 10, "cursor": second["next_cursor"]},
+        ).json()
+        assert len(third["items"]) == 5
+        assert third["next_cursor"] is None
+
+    def test_update_item(self, client, sample_wardrobe_item):
+        created = client.post(
+            "/api/v1/wardrobe", json=sample_wardrobe_item
+        ).json()
+        response = client.put(
+            f"/api/v1/wardrobe/{created['id']}",
+            json={"color_primary": "紺"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["color_primary"] == "紺"
+        # 他フィールドは維持される
+        assert data["category"] == "トップス"
+
+    def test_update_item_not_found(self, client):
+        response = client.put(
+            f"/api/v1/wardrobe/{uuid4()}", json={"color_primary": "紺"}
+        )
+        assert response.status_code == 404
+
+    def test_delete_item(self, client, sample_wardrobe_item):
+        created = client.post(
+            "/api/v1/wardrobe", json=sample_wardrobe_item
+        ).json()
+        assert client.delete(
+            f"/api/v1/wardrobe/{created['id']}"
+        ).status_code == 204
+        assert client.get(
+            f"/api/v1/wardrobe/{created['id']}"
+        ).status_code == 404
+
+
+class TestUpload:
+    @pytest.fixture
+    def upload_env(self, tmp_path, monkeypatch):
+        """アップロード先を一時ディレクトリへ向け、Celery投入をフェイク化"""
+        from app.api.v1.endpoints import wardrobe as wardrobe_endpoint
+        from app.core.config import settings
+
+        calls = []
+
+        def fake_delay(*args):
+            calls.append(args)
+            return SimpleNamespace(id="task-1")
+
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        monkeypatch.setattr(
+            wardrobe_endpoint.process_image_task, "delay", fake_delay
+        )
+        return SimpleNamespace(dir=tmp_path, calls=calls)
+
+    @staticmethod
+    def _upload(client, content=b"fake-jpeg-bytes", filename="shirt.jpg"):
+        return client.post(
+            "/api/v1/wardrobe/upload",
+            files={"file": (filename, content, "image/jpeg")},
+        )
+
+    def test_upload_dispatches_processing(self, client, upload_env):
+        response = self._upload(client)
+        assert response.status_code == 202
+        data = response.json()
+        assert data["duplicate"] is False
+        assert data["task_id"] == "task-1"
+        assert Path(data["image_path"]).exists()
+        # ハッシュがタスクまで引き渡される
+        assert upload_env.calls == [
+            (data["image_path"], data["content_hash"])
+        ]
+        # 一時ファイルは残らない
+        assert not list(upload_env.dir.glob("*.part"))
+
+    def test_upload_duplicate_short_circuits(
+        self, client, upload_env, make_item
+    ):
+        first = self._upload(client).json()
+        item_id = make_item(content_hash=first["content_hash"])
+
+        second = self._upload(client).json()
+        assert second["duplicate"] is True
+        assert second["task_id"] is None
+        assert second["item_id"] == item_id
+        # 再処理は投入されない
+        assert len(upload_env.calls) == 1
+        assert not list(upload_env.dir.glob("*.part"))
+
+    def test_upload_too_large(self, client, upload_env, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE", 4)
+        response = self._upload(client, content=b"x" * 10)
+        assert response.status_code == 413
+        # 書きかけの一時ファイルを残さない
+        assert not list(upload_env.dir.iterdir())
+        assert upload_env.calls == []
+
+    def test_upload_unsupported_extension(self, client, upload_env):
+        response = self._upload(client, filename="notes.txt")
+        assert response.status_code == 422
+        assert upload_env.calls == []
+
+    def test_upload_missing_filename(self, client, upload_env):
+        response = self._upload(client, filename="")
+        assert response.status_code == 422
+        assert upload_env.calls == []
+
+
+class TestOutfits:
+    def test_create_outfit(self, client, wardrobe_items, sample_outfit):
+        payload = dict(sample_outfit, item_ids=wardrobe_items)
+        response = client.post("/api/v1/outfits", json=payload)
+        assert response.status_code == 201
+        data = response.json()
+        assert data["item_ids"] == wardrobe_items
+        assert data["occasion"] == "仕事"
+
+    def test_create_outfit_missing_item(self, client, sample_outfit):
+        payload = dict(sample_outfit, item_ids=[str(uuid4())])
+        response = client.post("/api/v1/outfits", json=payload)
+        assert response.status_code == 404
+
+    def test_get_outfit_detail(self, client, wardrobe_items, sample_outfit):
+        payload = dict(sample_outfit, item_ids=wardrobe_items)
+        outfit_id = client.post("/api/v1/outfits", json=payload).json()["id"]
+
+        response = client.get(f"/api/v1/outfits/{outfit_id}")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 2
+        assert data["items"][0]["category"] == "トップス"
+
+    def test_get_outfit_not_found(self, client):
+        assert client.get(f"/api/v1/outfits/{uuid4()}").status_code == 404
+
+    def test_list_outfits(self, client, wardrobe_items, sample_outfit):
+        payload = dict(sample_outfit, item_ids=wardrobe_items)
+        client.post("/api/v1/outfits", json=payload)
+
+        response = client.get("/api/v1/outfits")
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+
+    def test_rate_outfit(self, client, wardrobe_items, sample_outfit):
+        payload = dict(sample_outfit, item_ids=wardrobe_items)
+        outfit_id = client.post("/api/v1/outfits", json=payload).json()["id"]
+
+        response = client.post(
+            f"/api/v1/outfits/{outfit_id}/rate", params={"rating": 4}
+        )
+        assert response.status_code == 200
+        assert response.json()["user_rating"] == 4
+
+    def test_rate_outfit_invalid_rating(self, client):
+        # 範囲外はバリデーションで弾かれるため実在するoutfitは不要
+        response = client.post(
+            f"/api/v1/outfits/{uuid4()}/rate", params={"rating": 6}
+        )
+        assert response.status_code == 422
+
+    def test_record_wear(self, client, wardrobe_items, sample_outfit):
+        payload = dict(sample_outfit, item_ids=wardrobe_items)
+        outfit_id = client.post("/api/v1/outfits", json=payload).json()["id"]
+
+        response = client.post(
+            f"/api/v1/outfits/{outfit_id}/wear",
+            params={"worn_date": "2025-01-15"},
+        )
+        assert response.status_code == 200
+        assert response.json()["worn_date"] == "2025-01-15"
+
+        # 構成アイテムの着用履歴も更新される
+        item = client.get(f"/api/v1/wardrobe/{wardrobe_items[0]}").json()
+        assert item["wear_count"] == 1
+        assert item["last_worn"] == "2025-01-15"
+
+    def test_delete_outfit(self, client, wardrobe_items, sample_outfit):
+        payload = dict(sample_outfit, item_ids=wardrobe_items)
+        outfit_id = client.post("/api/v1/outfits", json=payload).json()["id"]
+
+        assert client.delete(
+            f"/api/v1/outfits/{outfit_id}"
+        ).status_code == 204
+        assert client.get(f"/api/v1/outfits/{outfit_id}").status_code == 404
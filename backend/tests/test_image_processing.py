@@ -0,0 +1,92 @@
+"""
+画像処理パイプライン（フォールバック経路）のテスト
+
+torch/transformers/ultralytics/rembgなしの環境でも動作する
+決定的フォールバックの振る舞いを検証する。
+ML各クラスはセッションスコープのフィクスチャ（conftest）から受け取り、
+モジュールトップでの重いインポート・テスト毎の再構築を避ける。
+"""
+import numpy as np
+
+
+class TestImageEmbedder:
+    def test_embed_shape_and_norm(self, embedder, sample_image):
+        vector = embedder.embed(sample_image)
+        assert vector.shape == (768,)
+        assert vector.dtype == np.float32
+        assert abs(float(np.linalg.norm(vector)) - 1.0) < 1e-5
+
+    def test_embed_deterministic(self, embedder, sample_image):
+        first = embedder.embed(sample_image)
+        second = embedder.embed(sample_image)
+        np.testing.assert_array_equal(first, second)
+
+    def test_batch_embed(self, embedder, sample_image):
+        vectors = embedder.batch_embed([sample_image, sample_image])
+        assert len(vectors) == 2
+        np.testing.assert_array_equal(vectors[0], vectors[1])
+
+    def test_find_similar(self, embedder):
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((10, 768)).astype(np.float32)
+        query = embeddings[3]
+        results = embedder.find_similar(query, embeddings, top_k=3)
+        assert len(results) == 3
+        # 自分自身が最も近い
+        assert results[0][0] == 3
+        assert abs(results[0][1] - 1.0) < 1e-5
+        # 類似度降順
+        assert results[0][1] >= results[1][1] >= results[2][1]
+
+
+class TestClothingDetector:
+    def test_fallback_detection(self, detector, sample_image):
+        detection = detector.detect(sample_image)
+        assert detection["category"] in detector.CATEGORY_NAMES.values()
+        assert detection["bbox"] == [0.0, 0.0, 64.0, 64.0]
+
+    def test_batch_detect(self, detector, sample_image):
+        detections = detector.batch_detect([sample_image, sample_image])
+        assert len(detections) == 2
+
+
+class TestBackgroundRemover:
+    def test_remove_background_returns_rgba(self, bg_remover, sample_image):
+        result = bg_remover.remove_background(sample_image)
+        assert result.mode == "RGBA"
+        assert result.size == (64, 64)
+
+    def test_remove_background_saves_output(
+        self, bg_remover, sample_image, tmp_path
+    ):
+        output = tmp_path / "nobg.png"
+        bg_remover.remove_background(sample_image, str(output))
+        assert output.exists()
+
+    def test_create_white_background(self, bg_remover, sample_image):
+        rgba = bg_remover.remove_background(sample_image)
+        rgb = bg_remover.create_white_background(rgba)
+        assert rgb.mode == "RGB"
+
+
+class TestAttributeExtractor:
+    def test_extract_colors(self, attribute_extractor, sample_image):
+        colors = attribute_extractor.extract_colors(sample_image)
+        assert colors
+        assert all(
+            name in attribute_extractor.COLOR_PALETTE for name in colors
+        )
+        # 単色(120, 90, 60)の画像なので茶が最有力
+        assert colors[0] == "茶"
+
+    def test_rgb_to_color_name_exact(self, attribute_extractor):
+        assert attribute_extractor._rgb_to_color_name((250, 250, 250)) == "白"
+        assert attribute_extractor._rgb_to_color_name((10, 10, 10)) == "黒"
+
+    def test_extract_all_attributes(self, attribute_extractor, sample_image):
+        attributes = attribute_extractor.extract_all_attributes(sample_image)
+        assert attributes["category"] in attribute_extractor.CATEGORY_PROMPTS
+        assert attributes["pattern"] in attribute_extractor.PATTERN_PROMPTS
+        assert attributes["material"] in attribute_extractor.MATERIAL_PROMPTS
+        assert attributes["color_primary"] is not None
+        assert isinstance(attributes["season_tags"], list)
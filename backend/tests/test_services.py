@@ -0,0 +1,162 @@
+"""
+サービス層（ギャップ分析・天気）のテスト
+
+DBに依存しないため、-m no_db でエンジン構築なしに単独実行できる。
+"""
+import pytest
+
+from app.services.gap_analyzer import WardrobeGapAnalyzer
+from app.services.weather import WeatherService
+
+pytestmark = pytest.mark.no_db
+
+
+def _item(category, color=None, styles=None, seasons=None, name=""):
+    return {
+        "category": category,
+        "color_primary": color,
+        "style_tags": styles or [],
+        "season_tags": seasons or [],
+        "subcategory": name,
+    }
+
+
+class TestGapAnalyzer:
+    def setup_method(self):
+        self.analyzer = WardrobeGapAnalyzer()
+
+    def test_analyze_empty_wardrobe(self):
+        result = self.analyzer.analyze([])
+        assert result["total_items"] == 0
+        assert result["outfit_combinations"] == 0
+        assert result["gap_score"] == 0.0
+
+    def test_category_distribution(self):
+        items = [
+            _item("トップス"),
+            _item("トップス"),
+            _item("ボトムス"),
+        ]
+        result = self.analyzer.analyze(items)
+        dist = result["category_distribution"]
+        assert dist["distribution"] == {"トップス": 2, "ボトムス": 1}
+        assert dist["most_common"] == "トップス"
+        assert dist["least_common"] == "ボトムス"
+
+    def test_essential_items_missing(self):
+        items = [_item("トップス", name="白シャツ")]
+        result = self.analyzer.analyze(items)
+        tops = result["essential_items"]["トップス"]
+        assert tops["filled"] == 1
+        missing_names = {m["item"] for m in tops["missing"]}
+        assert "Tシャツ" in missing_names
+        assert "ニット" in missing_names
+
+    def test_outfit_combinations(self):
+        items = [
+            _item("トップス"), _item("トップス"), _item("トップス"),
+            _item("ボトムス"), _item("ボトムス"),
+            _item("アウター"),
+        ]
+        # 3トップス × 2ボトムス × (1アウター + なし)
+        assert self.analyzer.calculate_outfit_combinations(items) == 12
+
+    def test_recommendations_for_sparse_wardrobe(self):
+        items = [_item("トップス", styles=["カジュアル"], seasons=["夏"])]
+        result = self.analyzer.analyze(items)
+        priorities = {r["priority"] for r in result["recommendations"]}
+        assert "high" in priorities
+        assert "medium" in priorities
+
+    def test_gap_score_monotonic(self):
+        sparse = [_item("トップス", name="Tシャツ")]
+        full = [
+            _item("トップス", name="白シャツ", styles=["カジュアル"],
+                  seasons=["春", "夏"]),
+            _item("トップス", name="白シャツ", styles=["ビジネス"],
+                  seasons=["秋"]),
+            _item("トップス", name="Tシャツ", styles=["カジュアル"],
+                  seasons=["夏"]),
+            _item("ボトムス", name="デニム", styles=["カジュアル"],
+                  seasons=["春", "秋"]),
+            _item("アウター", name="コート", styles=["フォーマル"],
+                  seasons=["冬"]),
+        ]
+        assert (
+            self.analyzer.analyze(full)["gap_score"]
+            > self.analyzer.analyze(sparse)["gap_score"]
+        )
+
+
+class TestWeatherService:
+    def setup_method(self):
+        self.service = WeatherService(api_key="dummy")
+
+    def test_parse_forecast_data(self):
+        data = {
+            "list": [
+                {
+                    "dt_txt": "2025-01-15 09:00:00",
+                    "main": {"temp": 5.0, "humidity": 40},
+                    "wind": {"speed": 2.0},
+                    "weather": [{"main": "Clear"}],
+                },
+                {
+                    "dt_txt": "2025-01-15 12:00:00",
+                    "main": {"temp": 9.0, "humidity": 60},
+                    "wind": {"speed": 4.0},
+                    "weather": [{"main": "Clouds"}],
+                },
+                {
+                    "dt_txt": "2025-01-15 15:00:00",
+                    "main": {"temp": 7.0, "humidity": 50},
+                    "wind": {"speed": 3.0},
+                    "weather": [{"main": "Clouds"}],
+                },
+                {
+                    "dt_txt": "2025-01-16 09:00:00",
+                    "main": {"temp": 3.0, "humidity": 70},
+                    "wind": {"speed": 5.0},
+                    "weather": [{"main": "Rain"}],
+                },
+            ]
+        }
+        forecast = self.service._parse_forecast_data(data, days=5)
+        assert len(forecast) == 2
+        day1 = forecast[0]
+        assert day1["date"] == "2025-01-15"
+        assert day1["temp_min"] == 5.0
+        assert day1["temp_max"] == 9.0
+        assert day1["temp_avg"] == 7.0
+        assert day1["condition"] == "Clouds"
+        assert forecast[1]["condition"] == "Rain"
+
+    def test_parse_forecast_respects_days_limit(self):
+        data = {
+            "list": [
+                {
+                    "dt_txt": f"2025-01-{day:02d} 12:00:00",
+                    "main": {"temp": 10.0, "humidity": 50},
+                    "wind": {"speed": 1.0},
+                    "weather": [{"main": "Clear"}],
+                }
+                for day in range(10, 17)
+            ]
+        }
+        assert len(self.service._parse_forecast_data(data, days=3)) == 3
+
+    def test_clothing_recommendation_cold(self):
+        rec = self.service.get_clothing_recommendation(2.0, "Clear")
+        assert "ダウン" in rec["materials"]
+        assert rec["outer_recommended"] is True
+        assert rec["rain_gear"] is False
+
+    def test_clothing_recommendation_hot(self):
+        rec = self.service.get_clothing_recommendation(30.0, "Clear")
+        assert "リネン" in rec["materials"]
+        assert rec["outer_recommended"] is False
+
+    def test_clothing_recommendation_rain(self):
+        rec = self.service.get_clothing_recommendation(22.0, "Rain")
+        assert rec["rain_gear"] is True
+        assert rec["outer_recommended"] is True
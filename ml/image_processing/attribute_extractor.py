@@ -0,0 +1,315 @@
+"""
+属性抽出モジュール
+CLIPゼロショット分類とカラー分析による衣類属性の抽出
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+from .embedder import ImageEmbedder
+
+
+if _HAS_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def _histogram_palette(pixels, lut, n_colors):
+        """LUT参照と出現数カウントを融合したヒストグラムカーネル
+
+        量子化→LUT→カウントを1パスで回し、NumPy版が作る
+        インデックス中間配列を持たない。カウントはスレッド毎の
+        ローカル配列に積んで最後に合算する（atomic不要）。
+        """
+        n_threads = get_num_threads()
+        n = pixels.shape[0]
+        local = np.zeros((n_threads, n_colors), dtype=np.int64)
+        chunk = (n + n_threads - 1) // n_threads
+        for t in prange(n_threads):
+            start = t * chunk
+            end = min(start + chunk, n)
+            for i in range(start, end):
+                r = int(pixels[i, 0]) >> 3
+                g = int(pixels[i, 1]) >> 3
+                b = int(pixels[i, 2]) >> 3
+                local[t, lut[r, g, b]] += 1
+        counts = np.zeros(n_colors, dtype=np.int64)
+        for t in range(n_threads):
+            counts += local[t]
+        return counts
+
+
+def _srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """sRGB(0-255)をCIE Lab（D65）へ変換する
+
+    RGBユークリッド距離は知覚的に歪む（紺が青より黒に寄る等）ため、
+    パレット最近傍の判定はLab空間で行う。LUT構築時の一括変換でしか
+    呼ばれないので速度要件はない。
+
+    Args:
+        rgb: (N, 3) float配列
+
+    Returns:
+        np.ndarray: (N, 3) float32のLab値
+    """
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(
+        c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4
+    )
+    matrix = np.array([
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ])
+    xyz = linear @ matrix.T
+    # D65白色点で正規化
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+
+    delta = 6.0 / 29.0
+    f = np.where(
+        xyz > delta ** 3,
+        np.cbrt(xyz),
+        xyz / (3.0 * delta ** 2) + 4.0 / 29.0,
+    )
+    lab = np.empty_like(f)
+    lab[:, 0] = 116.0 * f[:, 1] - 16.0
+    lab[:, 1] = 500.0 * (f[:, 0] - f[:, 1])
+    lab[:, 2] = 200.0 * (f[:, 1] - f[:, 2])
+    return lab.astype(np.float32)
+
+
+def _build_color_lut(palette: np.ndarray) -> np.ndarray:
+    """32x32x32のRGB→最近傍パレットindex LUTを構築する
+
+    バケット中心（32^3 = 32768行）×パレットの距離計算は4096行タイルに
+    区切り、(タイル, K, 3) の中間配列を数百KBに抑えてL2キャッシュ内で
+    回す（一括ブロードキャストだと約5MBの一時配列がDRAMへ溢れる）。
+    """
+    grid = (
+        np.stack(
+            np.meshgrid(*[np.arange(32)] * 3, indexing="ij"), axis=-1
+        ).reshape(-1, 3) * 8 + 4
+    ).astype(np.float32)
+    grid_lab = _srgb_to_lab(grid)
+    palette_lab = _srgb_to_lab(palette)
+
+    out = np.empty(len(grid_lab), dtype=np.uint8)
+    for start in range(0, len(grid_lab), 4096):
+        chunk = grid_lab[start:start + 4096]
+        d2 = ((chunk[:, None, :] - palette_lab[None, :, :]) ** 2).sum(-1)
+        out[start:start + len(chunk)] = d2.argmin(1)
+    return out.reshape(32, 32, 32)
+
+
+class AttributeExtractor:
+    """
+    衣類画像から属性（カテゴリ、色、柄、素材等）を抽出するクラス
+    """
+
+    # CLIPゼロショット分類用のラベル → テキストプロンプト
+    CATEGORY_PROMPTS = {
+        "トップス": "a photo of a shirt, t-shirt or blouse",
+        "ボトムス": "a photo of pants, jeans or a skirt",
+        "アウター": "a photo of a jacket, coat or outerwear",
+        "ワンピース": "a photo of a dress or one-piece",
+        "シューズ": "a photo of shoes, sneakers or boots",
+        "アクセサリー": "a photo of an accessory, bag or hat",
+    }
+
+    PATTERN_PROMPTS = {
+        "無地": "clothing with a solid plain color",
+        "ストライプ": "clothing with a striped pattern",
+        "チェック": "clothing with a plaid or checkered pattern",
+        "花柄": "clothing with a floral pattern",
+        "ドット": "clothing with a polka dot pattern",
+    }
+
+    MATERIAL_PROMPTS = {
+        "綿": "clothing made of cotton",
+        "デニム": "clothing made of denim",
+        "ウール": "clothing made of wool or knit",
+        "レザー": "clothing made of leather",
+        "ポリエステル": "clothing made of polyester",
+        "リネン": "clothing made of linen",
+    }
+
+    # 色名 → 代表RGB値
+    COLOR_PALETTE = {
+        "白": (250, 250, 250),
+        "黒": (10, 10, 10),
+        "グレー": (128, 128, 128),
+        "赤": (200, 30, 40),
+        "青": (30, 60, 160),
+        "紺": (20, 30, 70),
+        "緑": (30, 120, 60),
+        "黄": (230, 200, 40),
+        "ベージュ": (220, 200, 170),
+        "茶": (120, 80, 50),
+        "ピンク": (240, 160, 190),
+        "紫": (130, 70, 150),
+        "オレンジ": (240, 140, 40),
+    }
+
+    # パレットの配列表現
+    _PALETTE_ARRAY = np.array(list(COLOR_PALETTE.values()), dtype=np.float32)
+    _PALETTE_NAMES = tuple(COLOR_PALETTE)
+
+    # RGB各軸を8刻み32バケットに量子化した最近傍パレットindexのLUT
+    # （32^3 = 32KB）。最近傍の判定は知覚均等なLab空間距離で行うが、
+    # 変換も距離計算もクラスロード時の1回きりで、実行時の参照コストは
+    # RGB版と同じ添字1回のまま
+    _COLOR_LUT = _build_color_lut(_PALETTE_ARRAY)
+
+    # 素材からの季節タグ推定
+    SEASON_BY_MATERIAL = {
+        "リネン": ["夏"],
+        "ウール": ["秋", "冬"],
+        "レザー": ["秋", "冬"],
+        "綿": ["春", "夏", "秋"],
+        "デニム": ["春", "秋", "冬"],
+        "ポリエステル": ["春", "夏", "秋", "冬"],
+    }
+
+    def __init__(self, embedder: Optional[ImageEmbedder] = None):
+        """
+        Args:
+            embedder: 共有するImageEmbedder（省略時は新規作成）
+        """
+        self.embedder = embedder or ImageEmbedder()
+        # プロンプト集合毎のテキスト埋め込み行列キャッシュ。
+        # プロンプトは固定なので、画像毎にtext encoderを回さず
+        # 初回の1バッチで計算して全画像で使い回す
+        self._text_features = {}
+        for prompts in (
+            self.CATEGORY_PROMPTS,
+            self.PATTERN_PROMPTS,
+            self.MATERIAL_PROMPTS,
+        ):
+            self._text_matrix(prompts)
+
+    def _text_matrix(self, prompts: dict) -> np.ndarray:
+        """プロンプト辞書に対応する (N, 768) テキスト埋め込みを返す"""
+        labels = tuple(prompts)
+        matrix = self._text_features.get(labels)
+        if matrix is None:
+            matrix = self._text_features[labels] = self.embedder.embed_texts(
+                list(prompts.values())
+            )
+        return matrix
+
+    def extract_all_attributes(self, image, embedding=None) -> dict:
+        """画像から全属性を抽出する
+
+        画像のデコードとCLIP vision forwardはここで1回だけ行い、
+        カテゴリ/柄/素材の分類は同じ埋め込みを各テキスト行列と
+        照合して求める（属性毎の再デコード・再forwardをしない）。
+        呼び出し側が埋め込みを計算済み（DB登録用のembed/batch_embed）
+        なら embedding で渡すことで、同一画像への2回目の
+        vision forwardを丸ごと省ける。
+
+        Args:
+            image: 画像ファイルのパスまたはPIL Image
+            embedding: 計算済みのCLIP埋め込み（省略時はここで計算）
+        """
+        from PIL import Image
+
+        if isinstance(image, str):
+            image = Image.open(image)
+        image = image.convert("RGB")
+
+        image_embedding = (
+            embedding if embedding is not None else self.embedder.embed(image)
+        )
+        category, cat_conf = self._classify_embedding(
+            image_embedding, self.CATEGORY_PROMPTS
+        )
+        pattern, _ = self._classify_embedding(
+            image_embedding, self.PATTERN_PROMPTS
+        )
+        material, _ = self._classify_embedding(
+            image_embedding, self.MATERIAL_PROMPTS
+        )
+        colors = self.extract_colors(image)
+
+        return {
+            "category": category,
+            "category_confidence": cat_conf,
+            "pattern": pattern,
+            "material": material,
+            "color_primary": colors[0] if colors else None,
+            "color_secondary": colors[1] if len(colors) > 1 else None,
+            "season_tags": self.SEASON_BY_MATERIAL.get(material, []),
+        }
+
+    def _classify_with_clip(
+        self, image, prompts: dict
+    ) -> Tuple[str, float]:
+        """CLIPゼロショット分類（コサイン類似度のargmax）"""
+        return self._classify_embedding(self.embedder.embed(image), prompts)
+
+    def _classify_embedding(
+        self, image_embedding: np.ndarray, prompts: dict
+    ) -> Tuple[str, float]:
+        """埋め込み済みベクトルをテキスト行列と照合して分類する
+
+        テキスト側はキャッシュ済み行列との行列ベクトル積1回で
+        全ラベルのスコアを求める。
+        """
+        scores = self._text_matrix(prompts) @ image_embedding
+        best = int(np.argmax(scores))
+        return tuple(prompts)[best], float(scores[best])
+
+    def extract_colors(self, image, n_colors: int = 3) -> list:
+        """画像の主要色を色名のリストで返す
+
+        最終的に13色パレットへ吸着させるので、k-meansの反復
+        クラスタリングは不要。全ピクセルをパレット最近傍へ直接
+        量子化し、出現数ヒストグラムの上位を返す。
+
+        Args:
+            image: 画像ファイルのパスまたはPIL Image
+        """
+        from PIL import Image
+
+        if isinstance(image, str):
+            image = Image.open(image)
+            # JPEGはdraftでデコード時に1/2〜1/8へDCT縮小させ、
+            # フル解像度のIDCT・メモリ確保を払わない（JPEG以外ではno-op）
+            image.draft("RGB", (150, 150))
+        # 色ヒストグラム用途なのでリサンプル品質は不要、BILINEARで十分
+        image = image.convert("RGB").resize(
+            (150, 150), Image.Resampling.BILINEAR
+        )
+        pixels = np.asarray(image, dtype=np.float32).reshape(-1, 3)
+
+        if _HAS_NUMBA:
+            counts = _histogram_palette(
+                pixels, self._COLOR_LUT, len(self._PALETTE_NAMES)
+            )
+        else:
+            counts = np.bincount(
+                self._palette_indices(pixels),
+                minlength=len(self._PALETTE_NAMES),
+            )
+        order = np.argsort(counts)[::-1][:n_colors]
+        return [self._PALETTE_NAMES[i] for i in order if counts[i] > 0]
+
+    def _palette_indices(self, pixels: np.ndarray) -> np.ndarray:
+        """各RGB行の最近傍パレットindexをLUT参照で求める（(N,)）
+
+        距離計算はLUT構築時に済んでいるので、ここは量子化（>>3相当）
+        とファンシーインデックスのみ。
+        """
+        q = pixels.astype(np.uint32) >> 3
+        return self._COLOR_LUT[q[:, 0], q[:, 1], q[:, 2]]
+
+    def _rgb_to_color_name(self, rgb) -> str:
+        """RGB値を最も近いパレット色名に変換する（LUT参照1回）"""
+        r, g, b = rgb
+        return self._PALETTE_NAMES[
+            self._COLOR_LUT[int(r) >> 3, int(g) >> 3, int(b) >> 3]
+        ]
@@ -0,0 +1,124 @@
+"""
+背景除去モジュール
+rembg (U2-Net) を使用した衣類画像の背景除去
+"""
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from .image_io import load_downsampled
+
+# 背景除去前に縮小する長辺上限
+_REMBG_MAX_SIDE = 1024
+
+
+class BackgroundRemover:
+    """
+    rembgを使用した背景除去クラス
+
+    rembg未インストール環境ではRGBA変換のみのフォールバックで動作する。
+    """
+
+    def __init__(self, model_name: str = "u2net"):
+        """
+        Args:
+            model_name: rembgのセッションモデル名
+        """
+        self.model_name = model_name
+        try:
+            from rembg import new_session, remove
+            # セッション（ONNXモデルロード込み）は1度だけ構築して
+            # 全呼び出し・全スレッドで共有する。CUDAがあればGPU実行。
+            # remove関数も呼び出し毎のimport文を避けるためここで束縛する
+            self._session = new_session(
+                model_name,
+                providers=["CUDAExecutionProvider", "CPUExecutionProvider"],
+            )
+            self._remove = remove
+        except ImportError:
+            self._session = None
+            self._remove = None
+        # 保存後のファイル最適化ツール（インストール済みの場合のみ使う）
+        self._oxipng = shutil.which("oxipng")
+        self._jpegoptim = shutil.which("jpegoptim")
+
+    def _optimize_file(self, path: str):
+        """保存済み画像を外部ツールで再圧縮する（30〜60%の縮小）
+
+        パイプラインをブロックしないようデーモンスレッドで実行する。
+        ツールが無ければ何もしない。
+        """
+        lower = path.lower()
+        if lower.endswith(".png") and self._oxipng:
+            cmd = [self._oxipng, "-o2", "--strip", "safe", path]
+        elif lower.endswith((".jpg", ".jpeg")) and self._jpegoptim:
+            cmd = [self._jpegoptim, "--strip-all", "--max=90", path]
+        else:
+            return
+        threading.Thread(
+            target=subprocess.run,
+            args=(cmd,),
+            kwargs={"check": False, "stdout": subprocess.DEVNULL},
+            daemon=True,
+        ).start()
+
+    def remove_background(self, image_path: str, output_path: Optional[str] = None):
+        """
+        画像から背景を除去する
+
+        Args:
+            image_path: 入力画像のパス
+            output_path: 指定時は除去結果をPNGで保存する
+
+        Returns:
+            PIL.Image: 背景除去済みRGBA画像
+        """
+        from PIL import Image
+
+        if self._session is not None:
+            # U2-Netの入力は320〜1024px程度。フル解像度を渡さず
+            # デコード時に縮小して前処理・転送コストを抑える
+            image, _ = load_downsampled(image_path, _REMBG_MAX_SIDE)
+            result = self._remove(image, session=self._session)
+        else:
+            # フォールバック: 除去なしでRGBA化のみ
+            result = Image.open(image_path).convert("RGBA")
+
+        if output_path:
+            result.save(output_path)
+            self._optimize_file(output_path)
+        return result
+
+    def remove_background_batch(
+        self, image_paths: List[str], max_workers: Optional[int] = None
+    ) -> list:
+        """複数画像の背景除去（スレッド並列）
+
+        ONNX Runtimeは推論中にGILを解放するためスレッドで
+        スケールする。共有セッションをそのまま各スレッドで使う。
+        """
+        if len(image_paths) <= 1:
+            return [self.remove_background(path) for path in image_paths]
+        with ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count()
+        ) as executor:
+            return list(executor.map(self.remove_background, image_paths))
+
+    def create_white_background(self, rgba_image):
+        """透過部分を白背景に合成したRGB画像を返す
+
+        RGBAの中間キャンバスを経由せず、RGB白地へ直接αマスク付き
+        pasteする（RGBA→RGB変換1パス分の走査と確保を省く。
+        pasteのC経路はpillow-simd導入時にSIMD化される）。
+        """
+        from PIL import Image
+
+        background = Image.new("RGB", rgba_image.size, (255, 255, 255))
+        if rgba_image.mode == "RGBA":
+            background.paste(rgba_image, mask=rgba_image.getchannel("A"))
+        else:
+            background.paste(rgba_image)
+        return background
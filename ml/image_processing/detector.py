@@ -1,35 +1,156 @@
 """
 衣類検出モジュール
-Phase 2で実装予定: YOLOv8を使用した衣類検出
+YOLOv8を使用した衣類検出
 """
+from typing import List, Optional
+
+from .image_io import load_downsampled
+
+# 検出前に縮小する長辺上限（YOLO入力の640pxに対し余裕を持たせる）
+_DETECT_MAX_SIDE = 960
+
 
 class ClothingDetector:
     """
     YOLOv8を使用した衣類検出クラス
+
+    ultralytics未インストール環境では画像全域を対象とする
+    フォールバック検出で動作する。
     """
 
+    # カスタム学習モデルのクラスID → 衣類カテゴリ
+    CATEGORY_NAMES = {
+        0: "トップス",
+        1: "ボトムス",
+        2: "アウター",
+        3: "ワンピース",
+        4: "シューズ",
+        5: "アクセサリー",
+    }
+
     def __init__(self, model_path: str = "yolov8n.pt"):
         """
         Args:
             model_path: YOLOv8モデルのパス
         """
         self.model_path = model_path
-        # Phase 2で実装:
-        # from ultralytics import YOLO
-        # self.model = YOLO(model_path)
+        try:
+            from ultralytics import YOLO
+            self.model = YOLO(model_path)
+        except ImportError:
+            self.model = None
 
-    def detect(self, image_path: str):
+    def detect(self, image) -> dict:
         """
-        画像から衣類を検出
+        画像から衣類を検出する（最大領域の検出結果を採用）
 
         Args:
-            image_path: 画像ファイルのパス
+            image: 画像ファイルのパスまたはPIL Image
 
         Returns:
-            dict: 検出結果（カテゴリ、座標等）
+            dict: {category, confidence, bbox}
+        """
+        if self.model is None:
+            return self._fallback_detection(image)
+
+        scale = 1.0
+        source = image
+        if isinstance(image, str):
+            # フル解像度をモデルに渡してもimgszへ縮小されるだけなので、
+            # デコード時点で縮小して前処理コストを下げる
+            source, scale = load_downsampled(image, _DETECT_MAX_SIDE)
+
+        results = self.model(source, verbose=False)
+        detection = self._select_largest_box(results[0])
+        if detection is None:
+            return self._fallback_detection(image)
+        if scale != 1.0:
+            # bboxは元画像の座標系へ戻す
+            detection["bbox"] = [v * scale for v in detection["bbox"]]
+        return detection
+
+    def _select_largest_box(self, result) -> Optional[dict]:
+        """検出ボックスのうち最大面積のものを選ぶ
+
+        box毎に .cpu() するとGPU→CPU同期がO(ボックス数)回走るため、
+        xyxy/conf/clsの各テンソルを1回ずつCPUへ引き揚げてから
+        面積のargmaxで選ぶ。
         """
-        # Phase 2で実装
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return None
+
+        xyxy = boxes.xyxy.cpu().numpy()
+        confs = boxes.conf.cpu().numpy()
+        classes = boxes.cls.cpu().numpy().astype(int)
+        areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+        i = int(areas.argmax())
         return {
-            "status": "not_implemented",
-            "message": "YOLOv8 detection to be implemented in Phase 2"
+            "category": self.CATEGORY_NAMES.get(int(classes[i]), "その他"),
+            "confidence": float(confs[i]),
+            "bbox": [float(v) for v in xyxy[i]],
         }
+
+    def batch_detect(self, image_paths: List[str]) -> list:
+        """複数画像の検出
+
+        1枚ずつmodel()を呼ばず、リストごと1回の推論に渡して
+        バッチforward+NMSをモデル側でまとめて行う。stream=Trueで
+        結果をジェネレータ受けにし、全画像分のResultsを保持しない。
+        """
+        if self.model is None:
+            return [self._fallback_detection(path) for path in image_paths]
+
+        half = False
+        try:
+            import torch
+            half = torch.cuda.is_available()
+        except ImportError:
+            pass
+
+        results = self.model(
+            image_paths, verbose=False, stream=True, imgsz=640, half=half
+        )
+        detections = []
+        for path, result in zip(image_paths, results):
+            detection = self._select_largest_box(result)
+            detections.append(detection or self._fallback_detection(path))
+        return detections
+
+    def _fallback_detection(self, image) -> dict:
+        """モデルなし/検出なし時のフォールバック（画像全域）
+
+        必要なのはサイズだけなので、パス入力はimagesizeの
+        ヘッダ読みだけで済ませる（フルデコードしない）。
+        """
+        if isinstance(image, str):
+            width, height = self._read_image_size(image)
+        else:
+            width, height = image.size
+        return {
+            "category": "トップス",
+            "confidence": 0.0,
+            "bbox": [0.0, 0.0, float(width), float(height)],
+            "fallback": True,
+        }
+
+    @staticmethod
+    def _read_image_size(path: str):
+        """画像サイズをファイルヘッダのみから読む
+
+        imagesizeは数百バイトのマーカー読みで済む。未導入環境は
+        PILのlazy open（こちらもピクセルはデコードしない）を使う。
+        """
+        try:
+            import imagesize
+
+            width, height = imagesize.get(path)
+            if width > 0 and height > 0:
+                return width, height
+        except ImportError:
+            pass
+
+        from PIL import Image
+
+        with Image.open(path) as im:
+            return im.size
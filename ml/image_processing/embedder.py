@@ -1,37 +1,391 @@
 """
 画像埋め込みモジュール
-Phase 2で実装予定: CLIPを使用した画像のベクトル化
+CLIPを使用した画像/テキストのベクトル化
 """
+import hashlib
+import os
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+# パス入力の画像埋め込みLRUキャッシュの上限
+_IMAGE_CACHE_SIZE = 128
+
 
 class ImageEmbedder:
     """
     CLIPを使用した画像埋め込みクラス
+
+    transformers/torch未インストール環境では、ファイル内容から決定的に
+    生成した疑似ベクトルを返すフォールバックで動作する。
     """
 
-    def __init__(self, model_name: str = "openai/clip-vit-base-patch32"):
+    EMBEDDING_DIM = 768
+
+    def __init__(
+        self,
+        model_name: str = "openai/clip-vit-large-patch14",
+        backend: str = "transformers",
+        server_url: str = "http://localhost:8080",
+        cache_dir: str = "~/.cache/wardrobe_clip",
+    ):
         """
         Args:
-            model_name: CLIPモデル名
+            model_name: CLIPモデル名（768次元出力のモデルを想定）
+            backend: 'transformers'（インプロセス）または 'tei'
+                （常駐埋め込みサーバへHTTP委譲。動的バッチングが効くため
+                並行インジェスト時のスループットが高い）
+            server_url: backend='tei' 時のサーバURL
+            cache_dir: パス入力の埋め込みを内容ハッシュで永続化する
+                ディレクトリ（Noneで無効）。再タグ付け等の再実行時は
+                forwardせず.npyロードで済む
         """
         self.model_name = model_name
-        # Phase 2で実装:
-        # from transformers import CLIPProcessor, CLIPModel
-        # self.model = CLIPModel.from_pretrained(model_name)
-        # self.processor = CLIPProcessor.from_pretrained(model_name)
+        self.backend = backend
+        self.server_url = server_url.rstrip("/")
+        # (path, mtime) → 埋め込み。同一ファイルへの再埋め込みは
+        # vision forwardを払わずキャッシュから返す
+        self._image_cache: OrderedDict = OrderedDict()
+        self._torch = None
+        self.device = "cpu"
+        self.model = None
+        self.processor = None
+        self._session = None
 
-    def embed(self, image_path: str):
-        """
-        画像をベクトルに変換
+        # 内容ハッシュ→.npyの永続キャッシュ。モデル名をパスに含め、
+        # モデル差し替え時は自動で無効化される
+        self._cache_dir = None
+        if cache_dir:
+            directory = os.path.join(
+                os.path.expanduser(cache_dir), model_name.replace("/", "_")
+            )
+            try:
+                os.makedirs(directory, exist_ok=True)
+                self._cache_dir = directory
+            except OSError:
+                self._cache_dir = None
+
+        if backend == "tei":
+            try:
+                import requests
+
+                # keep-aliveで接続を使い回す
+                self._session = requests.Session()
+            except ImportError:
+                self.backend = "transformers"
+        if self.backend == "transformers":
+            self._load_local_model()
+
+    def _load_local_model(self):
+        """インプロセスのCLIPモデルをロードする（未導入環境では何もしない）"""
+        try:
+            import torch
+            from transformers import CLIPModel, CLIPProcessor
+
+            self._torch = torch
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.model = CLIPModel.from_pretrained(self.model_name)
+            if self.device == "cuda":
+                # FP16推論: メモリ帯域半減・Tensor Core利用。
+                # 出力はnumpy境界でfloat32へ戻す
+                self.model = self.model.half()
+            self.model.eval()
+            self.model.to(self.device)
+            self.processor = CLIPProcessor.from_pretrained(self.model_name)
+        except ImportError:
+            self._torch = None
+            self.device = "cpu"
+            self.model = None
+            self.processor = None
+
+    def _embed_remote(self, source):
+        """埋め込みサーバの/embedへ委譲する（失敗時はNone）
 
         Args:
-            image_path: 画像ファイルのパス
+            source: 画像パス/PIL Image/テキスト
+        """
+        import base64
+        import io
 
-        Returns:
-            list: 768次元のベクトル埋め込み
+        try:
+            if isinstance(source, str) and os.path.exists(source):
+                with open(source, "rb") as f:
+                    payload = base64.b64encode(f.read()).decode("ascii")
+            elif isinstance(source, str):
+                payload = source
+            else:
+                buffer = io.BytesIO()
+                source.convert("RGB").save(buffer, format="JPEG")
+                payload = base64.b64encode(buffer.getvalue()).decode("ascii")
+
+            response = self._session.post(
+                f"{self.server_url}/embed",
+                json={"inputs": payload},
+                timeout=10,
+            )
+            response.raise_for_status()
+            vector = np.asarray(response.json()[0], dtype=np.float32)
+            return vector / np.linalg.norm(vector)
+        except Exception:
+            # サーバ不達・不正応答はNoneを返し、呼び出し側で
+            # インプロセス実行へフォールバックする
+            return None
+
+    def _remote_failed(self):
+        """サーバ不達時にインプロセス実行へ切り替える（以後は再試行しない）"""
+        self.backend = "transformers"
+        self._load_local_model()
+
+    def _to_device(self, inputs: dict) -> dict:
+        """processor出力のテンソルを推論デバイスへ移す
+
+        CUDA時はpinned memory経由の非同期転送にして、前処理（CPU）と
+        H2Dコピーをオーバーラップさせる。
         """
-        # Phase 2で実装
+        if self.device == "cpu":
+            return inputs
         return {
-            "status": "not_implemented",
-            "message": "CLIP embedding to be implemented in Phase 2",
-            "vector": None
+            k: v.pin_memory().to(self.device, non_blocking=True)
+            for k, v in inputs.items()
         }
+
+    def embed(self, image) -> np.ndarray:
+        """
+        画像を768次元のL2正規化済みベクトルに変換する
+
+        Args:
+            image: 画像ファイルのパスまたはPIL Image
+
+        Returns:
+            np.ndarray: float32 (768,)
+        """
+        key = None
+        if isinstance(image, str):
+            try:
+                key = (image, os.path.getmtime(image))
+            except OSError:
+                key = None
+            if key is not None:
+                cached = self._image_cache.get(key)
+                if cached is not None:
+                    self._image_cache.move_to_end(key)
+                    return cached
+
+        cache_file = None
+        if key is not None and self._cache_dir is not None:
+            cache_file = self._disk_cache_path(image)
+            if cache_file is not None and os.path.exists(cache_file):
+                try:
+                    vector = np.load(cache_file)
+                    self._remember(key, vector)
+                    return vector
+                except (OSError, ValueError):
+                    pass
+
+        vector = self._embed_uncached(image)
+        if key is not None:
+            self._remember(key, vector)
+            if cache_file is not None:
+                self._disk_cache_store(cache_file, vector)
+        return vector
+
+    def _remember(self, key, vector: np.ndarray):
+        """メモリLRUへ登録する"""
+        self._image_cache[key] = vector
+        if len(self._image_cache) > _IMAGE_CACHE_SIZE:
+            self._image_cache.popitem(last=False)
+
+    def _disk_cache_path(self, path: str):
+        """ファイル内容のSHA-256から.npyキャッシュパスを求める
+
+        SHA-256はOpenSSLのSHA-NI実装で~2GB/s出るため、forward
+        1回に比べればハッシュはタダ同然。
+        """
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+        return os.path.join(self._cache_dir, f"{digest}.npy")
+
+    @staticmethod
+    def _disk_cache_store(cache_file: str, vector: np.ndarray):
+        """一時ファイル経由のアトミック書き込みで保存する"""
+        tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            np.save(tmp_path, vector)
+            # np.saveは拡張子.npyを付け足す
+            os.replace(f"{tmp_path}.npy", cache_file)
+        except OSError:
+            pass
+
+    def _embed_uncached(self, image) -> np.ndarray:
+        """キャッシュを介さない埋め込み本体"""
+        if self.backend == "tei":
+            vector = self._embed_remote(image)
+            if vector is not None:
+                return vector
+            self._remote_failed()
+
+        if self.model is None:
+            return self._fallback_embedding(image)
+
+        from PIL import Image
+
+        if isinstance(image, str):
+            image = Image.open(image).convert("RGB")
+        inputs = self._to_device(
+            self.processor(images=image, return_tensors="pt")
+        )
+        with self._torch.inference_mode():
+            features = self.model.get_image_features(**inputs)
+        vector = features[0].cpu().numpy().astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def batch_embed(self, images: List, batch_size: int = 16) -> list:
+        """複数画像のベクトル化
+
+        1枚ずつforwardせず、batch_size毎にまとめて1回の
+        get_image_featuresに通す（カーネル起動・前処理の固定費を償却）。
+        """
+        if self.model is None:
+            return [self.embed(image) for image in images]
+
+        from PIL import Image
+
+        vectors = []
+        for start in range(0, len(images), batch_size):
+            chunk = [
+                Image.open(img).convert("RGB") if isinstance(img, str) else img
+                for img in images[start:start + batch_size]
+            ]
+            inputs = self._to_device(
+                self.processor(images=chunk, return_tensors="pt")
+            )
+            with self._torch.inference_mode():
+                features = self.model.get_image_features(**inputs)
+            matrix = features.cpu().numpy().astype(np.float32)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            vectors.extend(matrix)
+        return vectors
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """テキストを768次元のL2正規化済みベクトルに変換する"""
+        return self.embed_texts([text])[0]
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """複数テキストをまとめてベクトル化する
+
+        1件ずつのtext encoder forwardではなく、padding付きの
+        1バッチで処理する。
+
+        Returns:
+            np.ndarray: float32 (N, 768)、各行L2正規化済み
+        """
+        if self.backend == "tei":
+            vectors = [self._embed_remote(text) for text in texts]
+            if all(v is not None for v in vectors):
+                return np.stack(vectors)
+            self._remote_failed()
+
+        if self.model is None:
+            return np.stack(
+                [self._fallback_embedding(text) for text in texts]
+            )
+
+        inputs = self._to_device(
+            self.processor(text=list(texts), return_tensors="pt", padding=True)
+        )
+        with self._torch.inference_mode():
+            features = self.model.get_text_features(**inputs)
+        matrix = features.cpu().numpy().astype(np.float32)
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    def find_similar(
+        self,
+        query_embedding: np.ndarray,
+        embeddings: np.ndarray,
+        top_k: int = 5,
+        normalize: bool = True,
+    ) -> list:
+        """
+        クエリベクトルに近い埋め込みを検索する
+
+        類似度は行列ベクトル積1回（BLAS）で全候補分を計算し、
+        上位k件はargpartitionでO(N)選択してからk件だけソートする。
+
+        Args:
+            query_embedding: (768,) のクエリベクトル
+            embeddings: (N, 768) の候補行列
+            top_k: 返す件数
+            normalize: Falseならembed()出力等の単位ベクトル前提で
+                再正規化を省く
+
+        Returns:
+            list: [(index, similarity), ...] 類似度降順
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if normalize:
+            query = query / np.linalg.norm(query)
+            matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        similarities = matrix @ query
+        k = min(top_k, len(similarities))
+        if k <= 0:
+            return []
+        part = np.argpartition(-similarities, k - 1)[:k]
+        top = part[np.argsort(-similarities[part])]
+        return [(int(i), float(similarities[i])) for i in top]
+
+    def find_similar_batch(
+        self,
+        queries: np.ndarray,
+        embeddings: np.ndarray,
+        top_k: int = 5,
+        normalize: bool = True,
+    ) -> list:
+        """複数クエリの類似検索を1回のGEMMでまとめて行う
+
+        Args:
+            queries: (M, 768) のクエリ行列
+            embeddings: (N, 768) の候補行列
+
+        Returns:
+            list: クエリ毎の [(index, similarity), ...]（類似度降順）
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if normalize:
+            queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+            matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        similarities = queries @ matrix.T
+        k = min(top_k, similarities.shape[1])
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+        part = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(similarities, part, axis=1)
+        order = np.argsort(-scores, axis=1)
+        indices = np.take_along_axis(part, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        return [
+            [(int(i), float(s)) for i, s in zip(row_idx, row_score)]
+            for row_idx, row_score in zip(indices, scores)
+        ]
+
+    def _fallback_embedding(self, source) -> np.ndarray:
+        """モデルなし時の決定的疑似ベクトル（同一入力→同一ベクトル）"""
+        if isinstance(source, str):
+            try:
+                with open(source, "rb") as f:
+                    digest = hashlib.sha256(f.read()).digest()
+            except OSError:
+                digest = hashlib.sha256(source.encode("utf-8")).digest()
+        else:
+            digest = hashlib.sha256(source.tobytes()).digest()
+        seed = int.from_bytes(digest[:8], "little")
+        rng = np.random.default_rng(seed)
+        vector = rng.standard_normal(self.EMBEDDING_DIM).astype(np.float32)
+        return vector / np.linalg.norm(vector)
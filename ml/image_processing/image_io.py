@@ -0,0 +1,29 @@
+"""
+画像読み込みユーティリティ
+"""
+from typing import Tuple
+
+
+def load_downsampled(path: str, max_side: int) -> Tuple[object, float]:
+    """長辺がmax_side以下になるよう縮小してロードする
+
+    JPEGはdraftによりデコード段階でDCT縮小（1/2〜1/8）されるため、
+    スマホ写真級の画像でもフル解像度のIDCT・メモリ確保を払わない。
+    モデル入力は640〜1024px程度なので検出・背景除去の前段に挟む。
+
+    Args:
+        path: 画像ファイルのパス
+        max_side: 縮小後の長辺上限
+
+    Returns:
+        (PIL.Image, float): 縮小済み画像と、元座標へ戻すための倍率
+        （元長辺 / 縮小後長辺。縮小なしなら1.0）
+    """
+    from PIL import Image
+
+    image = Image.open(path)
+    original_side = max(image.size)
+    image.draft("RGB", (max_side, max_side))
+    image.thumbnail((max_side, max_side), Image.Resampling.BILINEAR)
+    scaled_side = max(image.size)
+    return image, (original_side / scaled_side if scaled_side else 1.0)
@@ -0,0 +1,137 @@
+"""
+バッチインジェストパイプライン
+CPU前処理（デコード・背景除去）とバッチ推論（検出・埋め込み）の重ね合わせ
+"""
+import os
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from typing import List, Optional
+
+from .attribute_extractor import AttributeExtractor
+from .background_remover import BackgroundRemover
+from .detector import ClothingDetector
+from .embedder import ImageEmbedder
+
+# 前処理→推論間のキュー深さ。先行しすぎた前処理結果（デコード済み
+# PIL Image）がメモリを食い潰さないよう有界にする
+_QUEUE_SIZE = 16
+
+# 推論側のサブバッチサイズ
+_INFER_BATCH = 8
+
+
+class IngestPipeline:
+    """衣類画像インジェストのプロデューサ・コンシューマ型パイプライン
+
+    デコード・背景除去（CPUバウンド、rembg/ORTはGIL解放）は
+    スレッドプールで並列に先行させ、有界キュー越しに推論側へ渡す。
+    推論側は_INFER_BATCH毎にbatch_detect/batch_embedへまとめるため、
+    全体スループットは sum(CPU時間, 推論時間) ではなく
+    max(...) に近づく。
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[ImageEmbedder] = None,
+        detector: Optional[ClothingDetector] = None,
+        bg_remover: Optional[BackgroundRemover] = None,
+        attribute_extractor: Optional[AttributeExtractor] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            embedder/detector/bg_remover/attribute_extractor:
+                共有するモデルラッパー（省略時は新規作成）
+            max_workers: 前処理スレッド数（省略時はCPUコア数）
+        """
+        self.embedder = embedder or ImageEmbedder()
+        self.detector = detector or ClothingDetector()
+        self.bg_remover = bg_remover or BackgroundRemover()
+        # CLIPの重みを二重ロードしないようembedderを共有する
+        self.attribute_extractor = attribute_extractor or AttributeExtractor(
+            embedder=self.embedder
+        )
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def _preprocess(self, image_path: str):
+        """CPU側ステージ: 背景除去+白背景合成（ディスク書き戻しなし）"""
+        rgba = self.bg_remover.remove_background(image_path)
+        return image_path, self.bg_remover.create_white_background(rgba)
+
+    def process(self, image_paths: List[str]) -> list:
+        """画像群を処理して画像毎の結果dictを返す
+
+        Returns:
+            list: [{image_path, detection, attributes, embedding}, ...]
+                （入力順）。前処理に失敗した画像は末尾に
+                {image_path, error} として並ぶ
+        """
+        pipeline: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+
+        # 前処理に失敗した画像（欠損・破損ファイル等）。スキップして記録する
+        failures = []
+
+        def _drain(futures):
+            path, future = futures.popleft()
+            try:
+                pipeline.put(future.result())
+            except Exception as exc:
+                failures.append({"image_path": path, "error": str(exc)})
+
+        def _produce():
+            # 例外時でも終端Noneを必ず入れる。さもないとメインスレッドが
+            # pipeline.get()で永久にブロックし、1枚の不良画像で
+            # インジェスト全体がハングする
+            try:
+                # in-flightなfutureをキュー深さまでに制限して背圧をかける
+                with ThreadPoolExecutor(
+                    max_workers=self.max_workers
+                ) as executor:
+                    futures = deque()
+                    for path in image_paths:
+                        futures.append(
+                            (path, executor.submit(self._preprocess, path))
+                        )
+                        if len(futures) >= _QUEUE_SIZE:
+                            _drain(futures)
+                    while futures:
+                        _drain(futures)
+            finally:
+                pipeline.put(None)
+
+        producer = Thread(target=_produce, daemon=True)
+        producer.start()
+
+        results = []
+
+        def _infer(pending):
+            images = [image for _, image in pending]
+            detections = self.detector.batch_detect(images)
+            embeddings = self.embedder.batch_embed(images)
+            for (path, image), detection, embedding in zip(
+                pending, detections, embeddings
+            ):
+                results.append({
+                    "image_path": path,
+                    "detection": detection,
+                    # バッチ計算済みの埋め込みを渡し、画像毎の再forwardを省く
+                    "attributes":
+                        self.attribute_extractor.extract_all_attributes(
+                            image, embedding=embedding
+                        ),
+                    "embedding": embedding,
+                })
+
+        pending = []
+        while (item := pipeline.get()) is not None:
+            pending.append(item)
+            if len(pending) >= _INFER_BATCH:
+                _infer(pending)
+                pending = []
+        if pending:
+            _infer(pending)
+        producer.join()
+        results.extend(failures)
+        return results
@@ -1,25 +1,212 @@
 """
 コーディネート生成モジュール
-Phase 2で実装予定: ローカルLLMを使用したコーディネート提案
+vLLMサーバ（OpenAI互換API）を使用したコーディネート提案
 """
+import asyncio
+import functools
+import heapq
+import json
+from collections import defaultdict
+from operator import itemgetter
+
+import numpy as np
+from typing import List, Optional, Union
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # HTTPペイロードのシリアライズ/パースはC実装のorjsonで行う
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _json_loads = json.loads
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# カラーコーディネート採点用の相性マトリクス。
+# 色名はAttributeExtractor.COLOR_PALETTEと揃える
+_COLOR_NAMES = (
+    "白", "黒", "グレー", "赤", "青", "紺", "緑",
+    "黄", "ベージュ", "茶", "ピンク", "紫", "オレンジ",
+)
+_COLOR_IDX = {name: i for i, name in enumerate(_COLOR_NAMES)}
+
+# ベースカラー（何にでも合う）
+_NEUTRALS = frozenset({"白", "黒", "グレー", "紺", "ベージュ"})
+
+
+def _symmetric(pairs) -> dict:
+    """片方向のペア定義を色→相手集合の対称辞書に展開する
+
+    定義は(a, b)を一方向だけ書けばよく、ロード時に両方向へ展開して
+    frozensetで凍結する。参照側は `b in table[a]` のO(1)判定だけで
+    済み、逆方向の確認が不要になる。
+    """
+    table = defaultdict(set)
+    for a, b in pairs:
+        table[a].add(b)
+        table[b].add(a)
+    return {color: frozenset(partners) for color, partners in table.items()}
+
+
+# 補色に近い関係（コントラスト配色）
+_COMPLEMENTARY = _symmetric([
+    ("赤", "緑"),
+    ("青", "オレンジ"),
+    ("黄", "紫"),
+])
+
+# 類似色の関係（まとまりのある配色）
+_ANALOGOUS = _symmetric([
+    ("赤", "オレンジ"),
+    ("赤", "ピンク"),
+    ("オレンジ", "黄"),
+    ("黄", "ベージュ"),
+    ("茶", "ベージュ"),
+    ("茶", "オレンジ"),
+    ("青", "紺"),
+    ("青", "紫"),
+    ("紫", "ピンク"),
+    ("緑", "黄"),
+])
+
+_EMPTY_SET = frozenset()
+
+
+def _build_color_compat() -> "np.ndarray":
+    """NxNの色相性マトリクスをモジュールロード時に1度だけ構築する
+
+    採点時はインデックスのgatherだけで済み、Pythonレベルの
+    ペア毎ルール判定をホットパスから排除する。
+    """
+    n = len(_COLOR_NAMES)
+    compat = np.full((n, n), 0.6, dtype=np.float32)
+    for i, a in enumerate(_COLOR_NAMES):
+        for j, b in enumerate(_COLOR_NAMES):
+            if i == j:
+                value = 0.75  # 同色（ワントーン）
+            elif a in _NEUTRALS or b in _NEUTRALS:
+                value = 0.9
+            elif b in _COMPLEMENTARY.get(a, _EMPTY_SET):
+                value = 0.85
+            elif b in _ANALOGOUS.get(a, _EMPTY_SET):
+                value = 0.8
+            else:
+                continue
+            compat[i, j] = value
+    return compat
+
+
+_COLOR_COMPAT = _build_color_compat()
+
+# 静的プレフィックス（役割指示と出力形式）。全リクエストでバイト単位に
+# 同一の文字列を先頭に置くことで、vLLM側のprefix cache
+# （--enable-prefix-caching）がこの部分のprefillをスキップできる
+_PROMPT_PREFIX = """あなたはプロのスタイリストです。以下の条件で最適なコーディネートを提案してください。
+各案は次のJSON形式で1行ずつ出力してください:
+{"items": [ID, ...], "occasion": "場面", "reason": "提案理由"}
+
+"""
+
+# 動的サフィックス（リクエスト毎に変わる部分のみ）
+_PROMPT_SUFFIX_TEMPLATE = """提案数: {num_suggestions}案
+
+【天候】
+気温: {temp}°C / 天気: {condition} / 湿度: {humidity}%
+
+【予定】
+{schedule}
+
+【最近の着用履歴】
+{recent}
+
+【利用可能なアイテム】
+{items}
+
+提案:"""
+
 
 class OutfitGenerator:
     """
     ローカルLLMを使用したコーディネート生成クラス
+
+    vLLMサーバ（/v1/completions）へHTTPで推論を依頼する。
+    サーバ未起動やHTTPクライアント未導入の環境では、ルールベースの
+    フォールバック生成で動作する。
     """
 
-    def __init__(self, model_path: str = None):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        endpoint: str = "http://localhost:8000/v1/completions",
+        model_name: str = "meta-llama/Llama-3.2-11B-Vision-Instruct",
+        timeout: float = 30.0,
+    ):
         """
         Args:
-            model_path: LLMモデルのパス
+            model_path: LLMモデルのパス（vLLMサーバ側で使用）
+            endpoint: vLLMのOpenAI互換completionsエンドポイント
+            model_name: リクエストに載せるモデル名
+            timeout: HTTPタイムアウト秒
+
+        Note:
+            vLLMサーバは --enable-prefix-caching 付きで起動すること。
+            プロンプト先頭の静的プレフィックス（_PROMPT_PREFIX）の
+            prefillがキャッシュされ、TTFTが短縮される。
         """
         self.model_path = model_path
-        # Phase 2で実装:
-        # vLLMまたはTransformersでモデルをロード
+        self.endpoint = endpoint
+        self.model_name = model_name
+        self.timeout = timeout
+        # aiohttpの共有セッション（最初のasync呼び出しで構築）
+        self._session = None
+        # 同期フォールバック用requests.Session（初回利用時に構築）
+        self._requests_session = None
+        # スコア計算のメモ化。安定したワードローブでは同じアイテム集合が
+        # バッチを跨いで繰り返し現れるため、シグネチャ単位でキャッシュする
+        self._score_cached = functools.lru_cache(maxsize=4096)(
+            self._score_signature
+        )
+
+    async def _get_session(self):
+        """共有ClientSessionを返す
+
+        接続プール+keep-aliveを使い回し、呼び出し毎の
+        TCP/TLSハンドシェイクを払わない。
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=32, ttl_dns_cache=300, keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        """共有セッションを閉じる"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
 
-    def generate(self, context: dict):
+    def generate(self, context: dict, num_suggestions: int = 3) -> list:
         """
-        コーディネートを生成
+        コーディネートを生成（同期インターフェース）
 
         Args:
             context: {
@@ -28,13 +215,471 @@ class OutfitGenerator:
                 "wardrobe": 利用可能な衣類,
                 "recent_outfits": 最近の着用履歴
             }
+            num_suggestions: 提案数
+
+        Returns:
+            list: コーディネート提案（スコア降順）
+        """
+        async def _run():
+            # asyncio.runでループごと破棄するため、このループ上で
+            # 作られた共有セッションも抜ける前に閉じる
+            try:
+                return await self.generate_async(context, num_suggestions)
+            finally:
+                await self.close()
+
+        return asyncio.run(_run())
+
+    async def generate_async(
+        self, context: dict, num_suggestions: int = 3
+    ) -> list:
+        """コーディネートを生成（非同期）
+
+        複数ユーザー/複数日分はasyncio.gatherで束ねることで
+        ネットワーク待ちを重ねられる。
+        """
+        wardrobe = context.get("wardrobe") or []
+        # ワードローブが小さい、またはパーソナライズ材料（天候・予定・
+        # 履歴）が皆無の場合、LLMはルールベース以上の提案を出せない。
+        # ネットワーク往復（最悪タイムアウト30秒）を払わず直接生成する
+        if len(wardrobe) < max(4, num_suggestions * 2) or not (
+            context.get("weather")
+            or context.get("schedule")
+            or context.get("recent_outfits")
+        ):
+            suggestions = self._fallback_generation(context, num_suggestions)
+        else:
+            prompt = self._build_prompt(context, num_suggestions)
+            response = await self._call_llm(prompt, num_suggestions)
+            suggestions = self._parse_or_fallback(
+                context, response, num_suggestions
+            )
+        # 採点はCPUバウンドなのでワーカースレッドへ逃がし、
+        # gatherで並走している他の_call_llmを塞がない
+        return await asyncio.to_thread(
+            self._score_all,
+            suggestions,
+            wardrobe,
+            context.get("weather"),
+            num_suggestions,
+        )
+
+    def generate_batch(
+        self, contexts: List[dict], num_suggestions: int = 3
+    ) -> List[list]:
+        """複数コンテキストのコーディネートを一括生成（同期）"""
+        async def _run():
+            try:
+                return await self.generate_batch_async(
+                    contexts, num_suggestions
+                )
+            finally:
+                await self.close()
+
+        return asyncio.run(_run())
+
+    async def generate_batch_async(
+        self, contexts: List[dict], num_suggestions: int = 3
+    ) -> List[list]:
+        """複数コンテキストのコーディネートを一括生成（非同期）
+
+        全プロンプトを1回のPOSTで送る（vLLMのcompletionsは
+        prompt: List[str] を受け付ける）。サーバ側のcontinuous
+        batchingが1パスに詰めるため、N回の逐次呼び出しより速い。
+        同時実行数はvLLM側の --max-num-seqs /
+        --max-num-batched-tokens で調整する。
 
         Returns:
-            list: コーディネート提案（複数案）
+            List[list]: コンテキスト毎の提案リスト（入力順）
+        """
+        prompts = [
+            self._build_prompt(context, num_suggestions)
+            for context in contexts
+        ]
+        responses = await self._call_llm(prompts, num_suggestions)
+        if responses is None:
+            responses = [None] * len(contexts)
+        per_context = [
+            self._parse_or_fallback(context, response, num_suggestions)
+            for context, response in zip(contexts, responses)
+        ]
+
+        def _score_contexts():
+            return [
+                self._score_all(
+                    suggestions,
+                    context.get("wardrobe") or [],
+                    context.get("weather"),
+                    num_suggestions,
+                )
+                for context, suggestions in zip(contexts, per_context)
+            ]
+
+        # 全コンテキスト分の採点を1回のto_threadでまとめて逃がす
+        return await asyncio.to_thread(_score_contexts)
+
+    def _parse_or_fallback(
+        self, context: dict, response: Optional[str], num_suggestions: int
+    ) -> list:
+        """LLM応答をパースし、空ならルールベース生成で補う"""
+        suggestions = []
+        if response:
+            # UUID等の文字列IDと数値IDの表記揺れを吸収するため
+            # str形も許容集合に含める
+            wardrobe = context.get("wardrobe") or []
+            valid_ids = frozenset(
+                item.get("id") for item in wardrobe
+            ) | frozenset(str(item.get("id")) for item in wardrobe)
+            suggestions = self._parse_llm_response(response, valid_ids)
+        if not suggestions:
+            suggestions = self._fallback_generation(context, num_suggestions)
+        return suggestions
+
+    def _score_all(
+        self,
+        suggestions: list,
+        wardrobe: list,
+        weather: Optional[dict],
+        limit: int,
+    ) -> list:
+        """提案群を採点してスコア降順の上位limit件を返す（同期）
+
+        scoreは直前のループで必ず設定されるため、lambda+.getではなく
+        itemgetterをソートキーに使う。提案数がlimitを大きく超える場合
+        は全ソートO(n log n)ではなくheapqの部分選択O(n log k)にする。
         """
-        # Phase 2で実装
-        return {
-            "status": "not_implemented",
-            "message": "LLM-based outfit generation to be implemented in Phase 2",
-            "suggestions": []
+        for suggestion in suggestions:
+            suggestion["score"] = self._score_suggestion(
+                suggestion, wardrobe, weather
+            )
+        key = itemgetter("score")
+        if len(suggestions) > limit * 4:
+            return heapq.nlargest(limit, suggestions, key=key)
+        suggestions.sort(key=key, reverse=True)
+        return suggestions[:limit]
+
+    async def _call_llm(
+        self,
+        prompt: Union[str, List[str]],
+        num_suggestions: Optional[int] = None,
+    ) -> Optional[Union[str, List[str]]]:
+        """vLLMのcompletionsエンドポイントを呼ぶ（失敗時None）
+
+        promptにList[str]を渡すと1回のPOSTでまとめて推論され、
+        プロンプト順のList[str]が返る。単一プロンプトで
+        num_suggestionsを渡すとSSEストリーミングになり、必要数の
+        提案が揃った時点でデコードを打ち切る。
+        """
+        # 1提案はJSON形式で~150トークン程度。固定1000ではなく提案数
+        # からデコード上限を見積もり、vLLM側のKVキャッシュ占有と
+        # デコード時間を必要分に抑える
+        if num_suggestions:
+            max_tokens = 160 * num_suggestions + 80
+        else:
+            max_tokens = 1000
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": 0.7,
+            # 行儀の良い出力はここで早期終了させる
+            "stop": ["\n\n\n", "###"],
         }
+        if aiohttp is not None:
+            try:
+                if isinstance(prompt, str) and num_suggestions:
+                    return await self._call_llm_streaming(
+                        payload, num_suggestions
+                    )
+                session = await self._get_session()
+                async with session.post(
+                    self.endpoint,
+                    data=_json_dumps(payload),
+                    headers=_JSON_HEADERS,
+                ) as resp:
+                    resp.raise_for_status()
+                    data = _json_loads(await resp.read())
+                return self._split_choices(prompt, data)
+            except Exception:
+                return None
+        if requests is not None:
+            # aiohttp未導入: ブロッキングクライアントを別スレッドで実行し
+            # イベントループを塞がない
+            try:
+                return await asyncio.to_thread(self._call_llm_blocking, payload)
+            except Exception:
+                return None
+        return None
+
+    async def _call_llm_streaming(
+        self, payload: dict, num_suggestions: int
+    ) -> str:
+        """SSEストリーミング受信（必要数のJSONが揃い次第打ち切り）
+
+        max_tokens分を待たず、num_suggestions個の提案がパースできた
+        時点で接続を切る。モデルが300トークンで出し終えるなら
+        残り700トークン分のデコードを払わずに済む。
+        """
+        payload = dict(payload, stream=True)
+        session = await self._get_session()
+        buffer = ""
+        async with session.post(
+            self.endpoint,
+            data=_json_dumps(payload),
+            headers=_JSON_HEADERS,
+        ) as resp:
+            resp.raise_for_status()
+            async for raw_line in resp.content:
+                line = raw_line.decode("utf-8", errors="replace").strip()
+                if not line.startswith("data:"):
+                    continue
+                chunk = line[5:].strip()
+                if chunk == "[DONE]":
+                    break
+                try:
+                    # ValueErrorはorjson/stdlib両方のデコード失敗を捕捉する
+                    delta = _json_loads(chunk)["choices"][0]["text"]
+                except (ValueError, KeyError, IndexError):
+                    continue
+                buffer += delta
+                # オブジェクトが閉じた可能性のあるチャンクでのみ再パース
+                if "}" not in delta:
+                    continue
+                if len(self._parse_llm_response(buffer)) >= num_suggestions:
+                    break
+        return buffer
+
+    def _get_requests_session(self):
+        """同期フォールバック用のrequests.Sessionを返す
+
+        素のrequests.postは呼び出し毎にTCP/TLSを張り直す。Sessionに
+        プール付きHTTPAdapterをマウントして同一ホストへの接続を
+        使い回し、一時的な失敗は軽いバックオフ付きでリトライする。
+        """
+        if self._requests_session is None:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            session.headers.update(_JSON_HEADERS)
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(total=2, backoff_factor=0.2),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._requests_session = session
+        return self._requests_session
+
+    def _call_llm_blocking(self, payload: dict):
+        """requestsによる同期呼び出し（aiohttpなし環境のフォールバック）"""
+        response = self._get_requests_session().post(
+            self.endpoint,
+            data=_json_dumps(payload),
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return self._split_choices(
+            payload["prompt"], _json_loads(response.content)
+        )
+
+    @staticmethod
+    def _split_choices(prompt: Union[str, List[str]], data: dict):
+        """completions応答をプロンプト形状に合わせて復元する"""
+        choices = data["choices"]
+        if isinstance(prompt, str):
+            return choices[0]["text"]
+        texts = [""] * len(prompt)
+        for choice in choices:
+            texts[choice["index"]] = choice["text"]
+        return texts
+
+    def _build_prompt(self, context: dict, num_suggestions: int) -> str:
+        """コンテキストからLLMプロンプトを組み立てる"""
+        weather = context.get("weather") or {}
+        schedule = context.get("schedule") or []
+        wardrobe = context.get("wardrobe") or []
+        recent = context.get("recent_outfits") or []
+
+        # +=による文字列成長は毎回再確保でO(n^2)になるため、
+        # 行リストに貯めて最後にjoinする
+        item_lines = []
+        for i, item in enumerate(wardrobe):
+            pattern = item.get("pattern")
+            item_lines.append(
+                f"{i + 1}. {item.get('category', '不明')}"
+                f" - {item.get('color_primary', '不明')}色"
+                + (f"、{pattern}" if pattern else "")
+                + f" (ID: {item.get('id', 'unknown')})"
+            )
+        items_text = "\n".join(item_lines)
+
+        schedule_text = "\n".join(
+            f"- {event.get('time', '')} {event.get('title', '')}"
+            for event in schedule
+        )
+
+        recent_text = "\n".join(
+            f"- {outfit.get('worn_date', '')}: "
+            + "、".join(str(i) for i in outfit.get("item_ids", []))
+            for outfit in recent
+        )
+
+        return _PROMPT_PREFIX + _PROMPT_SUFFIX_TEMPLATE.format_map({
+            "num_suggestions": num_suggestions,
+            "temp": weather.get("temp", "不明"),
+            "condition": weather.get("condition", "不明"),
+            "humidity": weather.get("humidity", "不明"),
+            "schedule": schedule_text or "なし",
+            "recent": recent_text or "なし",
+            "items": items_text,
+        })
+
+    def _parse_llm_response(
+        self, response: str, valid_ids: Optional[frozenset] = None
+    ) -> list:
+        """LLM出力からJSON形式の提案を抽出する
+
+        raw_decodeで全文を1回走査する。行単位のjson.loadsと違い、
+        LLMが整形して複数行にまたげたJSONオブジェクトも拾える。
+        valid_idsを渡すとワードローブに存在しないID（LLMの幻覚）を
+        この場でO(1)判定で落とし、全IDが無効な提案は捨てる。
+        """
+        suggestions = []
+        decoder = json.JSONDecoder()
+        i = 0
+        n = len(response)
+        while i < n:
+            start = response.find("{", i)
+            if start < 0:
+                break
+            try:
+                obj, end = decoder.raw_decode(response, start)
+            except json.JSONDecodeError:
+                i = start + 1
+                continue
+            i = end
+            if not (isinstance(obj, dict) and isinstance(obj.get("items"), list)):
+                continue
+            if valid_ids is not None:
+                obj["items"] = [
+                    item_id for item_id in obj["items"] if item_id in valid_ids
+                ]
+                if not obj["items"]:
+                    continue
+            suggestions.append(obj)
+        return suggestions
+
+    def _fallback_generation(
+        self, context: dict, num_suggestions: int
+    ) -> list:
+        """ルールベースのフォールバック生成
+
+        トップス×ボトムスの組み合わせを作り、寒い日はアウターを足す。
+        LLM不達時でも提案が空にならないようにするための経路。
+        """
+        wardrobe = context.get("wardrobe") or []
+        weather = context.get("weather") or {}
+
+        categorized = defaultdict(list)
+        for item in wardrobe:
+            categorized[item.get("category", "その他")].append(item)
+
+        tops = categorized["トップス"]
+        bottoms = categorized["ボトムス"]
+        outers = categorized["アウター"]
+
+        # 寒暖判定はループ内で毎回weatherを引かず先に1度だけ行う
+        needs_outer = bool(
+            weather and weather.get("temp", 20) < 15 and outers
+        )
+        outer_id = outers[0].get("id") if needs_outer else None
+
+        suggestions = []
+        for top in tops:
+            top_id = top.get("id")
+            for bottom in bottoms:
+                if len(suggestions) >= num_suggestions:
+                    return suggestions
+                items = [top_id, bottom.get("id")]
+                if needs_outer:
+                    items.append(outer_id)
+                suggestions.append({
+                    "items": [i for i in items if i is not None],
+                    "occasion": "カジュアル",
+                    "reason": "ルールベース生成（LLM未使用）",
+                    "fallback": True,
+                })
+        return suggestions
+
+    def _score_suggestion(
+        self, suggestion: dict, wardrobe_items: list, weather: Optional[dict]
+    ) -> float:
+        """提案を色相性と季節適合で採点する（0.0〜1.0）"""
+        item_by_id = {
+            str(item.get("id")): item for item in wardrobe_items
+        }
+        items = [
+            item_by_id.get(str(item_id))
+            for item_id in suggestion.get("items", [])
+        ]
+        items = [item for item in items if item is not None]
+        if len(items) < 2:
+            return 0.5
+        # ハッシュ可能なシグネチャへ落としてメモ化キャッシュを引く。
+        # 気温は5°C刻みに丸め、微差でキーが散らばらないようにする
+        colors = tuple(
+            sorted(item.get("color_primary") or "" for item in items)
+        )
+        seasons = tuple(
+            sorted(tuple(item.get("season_tags") or ()) for item in items)
+        )
+        temp_bucket = None
+        if weather:
+            # 5°C刻みの切り捨て。閾値（10/25）が5の倍数なので
+            # 丸めても寒暖判定の境界は動かない
+            temp_bucket = int(weather.get("temp", 20) // 5) * 5
+        return self._score_cached(colors, seasons, temp_bucket)
+
+    def _score_signature(
+        self, colors: tuple, seasons: tuple, temp_bucket: Optional[int]
+    ) -> float:
+        """シグネチャに対するスコア本体（lru_cache経由で呼ばれる）"""
+        score = (
+            self._color_score(colors) * 0.6
+            + self._season_score(seasons, temp_bucket) * 0.4
+        )
+        return round(score, 3)
+
+    def _color_score(self, colors: tuple) -> float:
+        """色の組み合わせ採点（相性マトリクスの全ペア平均）
+
+        全ペアの相性を_COLOR_COMPATから1回のgatherで引き、
+        上三角（重複・対角を除く）の平均を返す。
+        """
+        idx = np.array(
+            [_COLOR_IDX[c] for c in colors if c in _COLOR_IDX],
+            dtype=np.intp,
+        )
+        if idx.size < 2:
+            return 0.7
+        pairwise = _COLOR_COMPAT[idx[:, None], idx[None, :]]
+        upper = np.triu_indices(idx.size, k=1)
+        return float(pairwise[upper].mean())
+
+    def _season_score(
+        self, seasons: tuple, temp_bucket: Optional[int]
+    ) -> float:
+        """気温と季節タグの適合度"""
+        if temp_bucket is None:
+            return 0.7
+        matched = 0
+        for tags in seasons:
+            if temp_bucket < 10 and "冬" in tags:
+                matched += 1
+            elif temp_bucket >= 25 and "夏" in tags:
+                matched += 1
+            elif "春" in tags or "秋" in tags:
+                matched += 1
+        return matched / len(seasons) if seasons else 0.5